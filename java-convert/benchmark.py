@@ -0,0 +1,38 @@
+from src.benchmark import benchmark, project_generator
+import argparse
+import json
+
+if __name__ == "__main__":
+    defaults = project_generator.DEFAULT_CONFIG
+    parser = argparse.ArgumentParser(description="Benchmark das etapas com um projeto Spring sintético")
+    parser.add_argument('--services', type=int, default=defaults['services'], help='Número de serviços')
+    parser.add_argument('--methods', type=int, default=defaults['methods'], help='Métodos por serviço/controller')
+    parser.add_argument('--fields', type=int, default=defaults['fields'], help='Campos por classe')
+    parser.add_argument('--controllers', type=int, default=defaults['controllers'], help='Número de controllers')
+    parser.add_argument('--repositories', type=int, default=defaults['repositories'], help='Número de repositórios')
+    parser.add_argument('--entities', type=int, default=defaults['entities'], help='Número de entidades (model)')
+    parser.add_argument('--no-lombok', action='store_true', default=False, help='Gerar o pom.xml sem lombok')
+    parser.add_argument('--jobs', type=int, default=1, help='Número de processos (padrão: 1)')
+    parser.add_argument('--cache', action='store_true', default=False, help='Usar o cache em disco')
+    parser.add_argument('--stages', nargs='*', default=None, help='Etapas medidas (padrão: todas)')
+    parser.add_argument('--keep-dir', type=str, default=None, help='Gerar e manter o projeto neste diretório')
+    parser.add_argument('--output', type=str, default=None, help='Arquivo JSON de saída (padrão: stdout)')
+
+    args = parser.parse_args()
+
+    config = {
+        'services': args.services,
+        'methods': args.methods,
+        'fields': args.fields,
+        'controllers': args.controllers,
+        'repositories': args.repositories,
+        'entities': args.entities,
+        'lombok': not args.no_lombok,
+    }
+
+    result = json.dumps(benchmark.run_benchmark(config, args.jobs, args.cache, args.stages, args.keep_dir), indent=4)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(result + '\n')
+    else:
+        print(result)
@@ -1,39 +1,165 @@
-from src.structure import infra_config, domain_config, data_config
-from src.utils import pom_info
-from src.usecase import usecases, usecases_impl
-from src.repository import repositories
-from src.controller import controller
+from src.pipeline import batch, pipeline, reactor, watch
+from src.usecase import rendering
+from src.utils import pom_info, disk_cache, parallel, templates, output_writer, vfs, profiler, symbol_index, \
+    file_discovery, restructure, events
 import argparse
+import contextlib
+import cProfile
 import json
+import os
+import sys
+import time
 
-options_functions = {
-    'refactor_use_cases': usecases.refactor_use_cases,
-    'refactor_impl': usecases_impl.refactor_use_cases_impl,
-    'refactor_controller': controller.refactor_controllers,
-    'refactor_repository': repositories.refactor_or_create_repositories,
-    'refactor_repository_impl': lambda _: print("Criar repository impl, ainda não implementado"),
-    'refactor_infrastructure': infra_config.refactor_infrastructure,
-    'refactor_domain': domain_config.refactor_domain,
-    'refactor_data': data_config.refactor_data,
-}
-
-
-def main(source_directory: str, options: dict, show_info_only: bool):
-    if show_info_only:
-        # Exibir apenas informações, não executar nenhuma ação
-        print("Apenas exibindo informações:")
-        print(f"Diretório de origem: {source_directory}")
-        print(f"Opções: {json.dumps(options, indent=4)}")
-        print(json.dumps(pom_info.extract_pom_information(source_directory), indent=4))
-    else:
-        for option, enabled in options.items():
-            if enabled and option in options_functions:
-                options_functions[option](source_directory)
+
+def run_pipeline(source_directory: str, options: dict, pstats_file: str = None, incremental: bool = False):
+    """
+    Executa o pipeline, com o cProfile ativo quando um arquivo pstats é informado.
+    """
+    if pstats_file is None:
+        pipeline.run_pipeline(source_directory, options, list(options), incremental)
+        return
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        pipeline.run_pipeline(source_directory, options, list(options), incremental)
+    finally:
+        profile.disable()
+        profile.dump_stats(pstats_file)
+
+
+def write_report(report_file: str, summary: dict, start: float):
+    """
+    Grava o relatório da execução (JSON ou NDJSON), se um arquivo foi informado.
+    """
+    events.flush()
+    if report_file is not None:
+        summary['seconds'] = round(time.perf_counter() - start, 6)
+        events.write_report(report_file, summary)
+
+
+def read_batch_file(batch_file: str) -> list:
+    """
+    Lê os diretórios dos projetos do lote: um por linha, ignorando linhas vazias e comentários (#).
+    """
+    with open(batch_file, 'r') as file:
+        lines = [line.strip() for line in file]
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+def main(source_directory: str, options: dict, show_info_only: bool, use_cache: bool = True, jobs: int = None,
+         templates_dir: str = None, plan_format: str = None, profile: bool = False, pstats_file: str = None,
+         trace_file: str = None, reactor_mode: bool = False, watch_interval: float = None,
+         incremental: bool = False, include: list = None, exclude: list = None, restructure_mode: str = 'copy',
+         grouping: str = 'method', log_level: str = 'info', report_file: str = None,
+         batch_directories: list = None):
+    start = time.perf_counter()
+    events.configure_events(log_level, record=report_file is not None)
+    file_discovery.configure_discovery(include, exclude)
+    restructure.configure_restructure(restructure_mode)
+    rendering.configure_rendering(grouping)
+    if profile or pstats_file or trace_file:
+        profiler.enable_profiler(trace=trace_file is not None)
+
+    try:
+        if show_info_only:
+            # Exibir apenas informações, não executar nenhuma ação
+            print("Apenas exibindo informações:")
+            print(f"Diretório de origem: {source_directory}")
+            print(f"Opções: {json.dumps(options, indent=4)}")
+            print(json.dumps(pom_info.extract_pom_information(source_directory), indent=4))
+            print(f"Modelo do projeto: {json.dumps(pom_info.load_pom(source_directory), indent=4)}")
+        elif plan_format is not None:
+            # Calcula todas as alterações em memória, sem gravar nada em disco
+            parallel.set_jobs(jobs)
+            vfs.enable_plan_mode()
+            if use_cache:
+                disk_cache.enable_cache(source_directory, read_only=True)
+            templates.configure_templates(templates_dir)
+            if incremental:
+                symbol_index.load_index()
+
+            with contextlib.redirect_stdout(sys.stderr):
+                run_pipeline(source_directory, options, pstats_file, incremental)
+                events.flush()
+            write_report(report_file, {'mode': 'plan', 'source_directory': source_directory}, start)
+
+            if plan_format == 'json':
+                print(json.dumps(vfs.get_change_plan(source_directory), indent=4))
+            else:
+                sys.stdout.write(vfs.get_unified_diff(source_directory))
+        else:
+            parallel.set_jobs(jobs)
+            bytecode_cache_dir = None
+            if use_cache:
+                # No lote, o cache de templates compilados do primeiro projeto serve para todos
+                disk_cache.enable_cache(source_directory)
+                bytecode_cache_dir = disk_cache.get_templates_cache_dir()
+            templates.configure_templates(templates_dir, bytecode_cache_dir)
+
+            if batch_directories:
+                # Vários projetos em um único processo: a inicialização é paga uma única vez
+                summaries = batch.run_batch(batch_directories, options, use_cache, incremental)
+                events.emit('summary', reactor.format_summary(summaries, os.getcwd()))
+                write_report(report_file, {
+                    'mode': 'batch',
+                    'projects': [{key: summary[key] for key in ('module', 'seconds', 'files', 'cache', 'error')}
+                                 for summary in summaries],
+                }, start)
+                return
+
+            if reactor_mode:
+                # Um processo para todos os módulos: templates e cache são carregados uma única vez
+                summaries = reactor.run_reactor(source_directory, options)
+                for summary in summaries:
+                    events.emit('module', f"== {summary['module']}\n{summary['log'].rstrip()}",
+                                module=summary['module'])
+                    events.add_records(summary['events'], summary['stages'], module=summary['module'])
+                events.emit('summary', reactor.format_summary(summaries, source_directory))
+                write_report(report_file, {
+                    'mode': 'reactor',
+                    'source_directory': source_directory,
+                    'modules': [{key: summary[key] for key in ('module', 'seconds', 'files', 'cache', 'error')}
+                                for summary in summaries],
+                }, start)
+                return
+
+            if watch_interval is not None:
+                try:
+                    watch.watch(source_directory, options, watch_interval)
+                except KeyboardInterrupt:
+                    pass
+                return
+
+            if incremental:
+                symbol_index.load_index()
+            run_pipeline(source_directory, options, pstats_file, incremental)
+
+            stats = output_writer.get_stats()
+            events.emit('summary', f"Arquivos: {stats[output_writer.WRITTEN]} gravados, "
+                                   f"{stats[output_writer.UNCHANGED]} inalterados, "
+                                   f"{stats[output_writer.SKIPPED]} ignorados")
+            summary = {'mode': 'run', 'source_directory': source_directory, 'files': stats}
+
+            if use_cache:
+                stats = disk_cache.get_stats()
+                events.emit('summary', f"Cache: {stats['hits']} acertos, {stats['misses']} falhas")
+                summary['cache'] = stats
+            write_report(report_file, summary, start)
+    finally:
+        events.flush()
+        if profiler.is_enabled():
+            print(profiler.format_report(), file=sys.stderr)
+            if trace_file is not None:
+                profiler.write_trace(trace_file)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Script para criar partes do projeto Java")
-    parser.add_argument('source_directory', type=str, help='Diretório de origem')
+    parser.add_argument('source_directory', type=str, nargs='*', default=[],
+                        help='Diretório de origem (vários diretórios são processados em lote, em um único processo)')
+    parser.add_argument('--batch-file', type=str, default=None, metavar='FILE',
+                        help='Arquivo com os diretórios dos projetos processados em lote, um por linha')
     parser.add_argument('--refactor-use-cases', action='store_true', default=True, help='Refatorar casos de uso')
     parser.add_argument('--refactor-impl', action='store_true', default=True, help='Refatorar implementações')
     parser.add_argument('--refactor-controller', action='store_true', default=True, help='Refatorar controladores')
@@ -43,10 +169,69 @@ if __name__ == "__main__":
     parser.add_argument('--refactor-infrastructure', action='store_true', default=True, help='Refatorar a camada de infraestrutura')
     parser.add_argument('--refactor-domain', action='store_true', default=True, help='Refatorar a camada de domínio')
     parser.add_argument('--refactor-data', action='store_true', default=True, help='Refatorar a camada de data ')
+    parser.add_argument('--refactor-references', action='store_true', default=False,
+                        help='Atualizar os imports e as referências aos tipos movidos ou renomeados, '
+                             'alterando também os arquivos de origem (services, controller...)')
     parser.add_argument('--show-info-only', action='store_true', default=False,
                         help='Mostrar apenas informações, não executar ações')
+    parser.add_argument('--plan', nargs='?', const='diff', default=None, choices=['diff', 'json'],
+                        help='Mostrar as alterações (unified diff ou JSON) sem gravar nada em disco')
+    parser.add_argument('--reactor', action='store_true', default=False,
+                        help='Processar todos os módulos declarados no pom.xml raiz (reactor Maven)')
+    parser.add_argument('--watch', action='store_true', default=False,
+                        help='Manter o processo ativo e regenerar as saídas a cada alteração nos arquivos')
+    parser.add_argument('--watch-interval', type=float, default=0.5,
+                        help='Intervalo, em segundos, entre as verificações do --watch')
+    parser.add_argument('--incremental', action='store_true', default=False,
+                        help='Processar apenas os arquivos alterados desde a última execução e os que dependem deles')
+    parser.add_argument('--profile', action='store_true', default=False,
+                        help='Mostrar o tempo de cada etapa e trecho e os contadores ao final')
+    parser.add_argument('--profile-pstats', type=str, default=None,
+                        help='Gravar o resultado do cProfile neste arquivo (pstats)')
+    parser.add_argument('--profile-trace', type=str, default=None,
+                        help='Gravar os eventos de tempo neste arquivo (Chrome trace JSON)')
+    parser.add_argument('--no-cache', action='store_true', default=False,
+                        help=f'Não usar o cache em disco ({disk_cache.CACHE_DIR_NAME})')
+    parser.add_argument('--templates-dir', type=str, default=None,
+                        help='Diretório com templates que substituem os templates padrão')
+    parser.add_argument('--include', action='append', default=None, metavar='GLOB',
+                        help='Processar apenas os arquivos .java que correspondem ao glob (pode ser repetido)')
+    parser.add_argument('--exclude', action='append', default=None, metavar='GLOB',
+                        help='Ignorar os arquivos e diretórios que correspondem ao glob (pode ser repetido)')
+    parser.add_argument('--restructure-mode', choices=restructure.MODES, default='copy',
+                        help='Como copiar os pacotes para domain/data/infra: copy, hardlink, reflink ou move '
+                             '(move remove os pacotes de origem). hardlink e reflink valem apenas para os '
+                             'arquivos gravados sem alterações: os .java realocados têm o pacote reescrito '
+                             'e são gravados como arquivos novos')
+    parser.add_argument('--grouping', choices=rendering.GROUPINGS, default='method',
+                        help='Gerar um caso de uso por método público (method) ou um contrato e uma '
+                             'implementação por serviço (class)')
+    parser.add_argument('--quiet', action='store_true', default=False,
+                        help='Exibir apenas avisos e erros (recomendado em projetos grandes)')
+    parser.add_argument('--verbose', action='store_true', default=False,
+                        help='Exibir também cada arquivo criado, ignorado, copiado ou renomeado')
+    parser.add_argument('--report', type=str, default=None, metavar='FILE',
+                        help='Gravar o relatório da execução (arquivos e tempo de cada etapa) em JSON, '
+                             'ou em NDJSON se o arquivo terminar em .ndjson ou .jsonl')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='Número de processos para analisar e renderizar os arquivos (padrão: número de CPUs)')
 
     args = parser.parse_args()
+    source_directories = args.source_directory + (read_batch_file(args.batch_file) if args.batch_file else [])
+    if not source_directories:
+        parser.error('informe o diretório de origem ou --batch-file')
+    if len(source_directories) > 1 and (args.plan or args.show_info_only or args.reactor or args.watch):
+        parser.error('vários diretórios não podem ser usados com --plan, --show-info-only, --reactor ou --watch')
+    if args.reactor and (args.plan or args.show_info_only):
+        parser.error('--reactor não pode ser usado com --plan ou --show-info-only')
+    if args.watch and (args.plan or args.show_info_only or args.reactor):
+        parser.error('--watch não pode ser usado com --plan, --show-info-only ou --reactor')
+    if args.quiet and args.verbose:
+        parser.error('--quiet não pode ser usado com --verbose')
+    if args.report and (args.watch or args.show_info_only):
+        parser.error('--report não pode ser usado com --watch ou --show-info-only')
+    if args.incremental and (args.no_cache or args.reactor):
+        parser.error('--incremental não pode ser usado com --no-cache ou --reactor')
 
     options = {
         'refactor_use_cases': args.refactor_use_cases,
@@ -57,9 +242,15 @@ if __name__ == "__main__":
         'refactor_infrastructure': args.refactor_infrastructure,
         'refactor_domain': args.refactor_domain,
         'refactor_data': args.refactor_data,
+        'refactor_references': args.refactor_references,
         'show_info_only': args.show_info_only
     }
 
-    main(args.source_directory, options, args.show_info_only)
+    main(source_directories[0], options, args.show_info_only, not args.no_cache, args.jobs,
+         args.templates_dir, args.plan, args.profile, args.profile_pstats, args.profile_trace,
+         args.reactor, args.watch_interval if args.watch else None, args.incremental,
+         args.include, args.exclude, args.restructure_mode, args.grouping,
+         'warning' if args.quiet else 'debug' if args.verbose else 'info', args.report,
+         source_directories if len(source_directories) > 1 else None)
 
 #  "/home/pedroermarinho/GitHub/evolutionfsw/sgc-api-java/src/main/java/io/prmord/sgc/services"
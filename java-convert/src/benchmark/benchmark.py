@@ -0,0 +1,173 @@
+import contextlib
+import functools
+import inspect
+import io
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+
+from src.benchmark import project_generator
+from src.pipeline import pipeline
+from src.utils import disk_cache, events, output_writer, parallel, project_layout, restructure, templates, util
+
+# Funções medidas em cada parte do tempo das etapas. Apenas a chamada mais externa é contada,
+# então o pool usado pela análise (load_java_units) não é contado também como renderização.
+# Nos geradores (imap_files), cada item é medido: o consumo entre os itens (write_file) fica de fora.
+BREAKDOWN_TARGETS = {
+    'parse': [(util, 'load_java_units'), (util, 'load_java_headers')],
+    'render': [(parallel, 'map_files'), (parallel, 'imap_files')],
+    'io': [
+        (output_writer, 'write_file'),
+        (output_writer, 'flush'),
+        (restructure, 'execute'),
+    ],
+}
+
+
+@contextlib.contextmanager
+def measure_breakdown(totals: Dict[str, float]):
+    """
+    Substitui temporariamente as funções de BREAKDOWN_TARGETS por versões que acumulam
+    o tempo de cada parte em totals.
+    """
+    active = []
+    originals = []
+
+    def timed(part, function):
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def generator_wrapper(*args, **kwargs):
+                iterator = function(*args, **kwargs)
+                while True:
+                    nested = bool(active)
+                    if not nested:
+                        active.append(part)
+                        start = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        if not nested:
+                            totals[part] += time.perf_counter() - start
+                            active.pop()
+                    yield item
+            return generator_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if active:
+                return function(*args, **kwargs)
+            active.append(part)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                totals[part] += time.perf_counter() - start
+                active.pop()
+        return wrapper
+
+    for part, targets in BREAKDOWN_TARGETS.items():
+        totals.setdefault(part, 0.0)
+        for module, name in targets:
+            originals.append((module, name, getattr(module, name)))
+            setattr(module, name, timed(part, getattr(module, name)))
+    try:
+        yield totals
+    finally:
+        for module, name, function in originals:
+            setattr(module, name, function)
+
+
+def get_peak_rss_kb() -> Dict[str, int]:
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def count_stage_files(layout: project_layout.ProjectLayout, name: str) -> int:
+    return (len(pipeline.route_java_files(layout, [name], 'unit'))
+            + len(pipeline.route_java_files(layout, [name], 'header')))
+
+
+def reset_state(project_path: str, jobs: int, use_cache: bool):
+    """
+    Limpa os caches em memória para que cada execução comece do zero.
+    """
+    util.clear_java_units()
+    output_writer.reset()
+    disk_cache.reset_stats()
+    restructure.reset_renames()
+    events.reset()
+    parallel.set_jobs(jobs)
+    templates.configure_templates()
+    if use_cache:
+        disk_cache.enable_cache(project_path)
+    else:
+        disk_cache.disable_cache()
+
+
+def run_benchmark(config: project_generator.ProjectConfig = None, jobs: int = 1, use_cache: bool = False,
+                  stage_names: List[str] = None, keep_dir: str = None) -> Dict:
+    """
+    Gera um projeto sintético e mede cada etapa separadamente, na ordem do pipeline.
+    Retorna o resultado em formato serializável (JSON).
+    """
+    work_dir = keep_dir or tempfile.mkdtemp(prefix='java-convert-bench-')
+    project_path = os.path.join(work_dir, 'project')
+    config = project_generator.generate_project(project_path, config)
+
+    stage_names = pipeline.get_stage_order(stage_names or list(pipeline.STAGES))
+    reset_state(project_path, jobs, use_cache)
+    layout = project_layout.load_project_layout(project_path)
+
+    stages = {}
+    breakdown = {}
+    start = time.perf_counter()
+    try:
+        for name in stage_names:
+            stage_breakdown = {}
+            stage_start = time.perf_counter()
+            with measure_breakdown(stage_breakdown), contextlib.redirect_stdout(io.StringIO()):
+                pipeline.get_stage_function(name)(project_path)
+            seconds = time.perf_counter() - stage_start
+
+            files = count_stage_files(layout, name)
+            stage_breakdown['other'] = max(0.0, seconds - sum(stage_breakdown.values()))
+            stages[name] = {
+                'seconds': round(seconds, 6),
+                'files': files,
+                'files_per_sec': round(files / seconds, 2) if files and seconds else None,
+                'breakdown': {part: round(value, 6) for part, value in stage_breakdown.items()},
+            }
+            for part, value in stage_breakdown.items():
+                breakdown[part] = breakdown.get(part, 0.0) + value
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    total_seconds = time.perf_counter() - start
+    return {
+        'commit': get_git_commit(),
+        'config': config,
+        'jobs': parallel.get_jobs(),
+        'cache': use_cache,
+        'total_seconds': round(total_seconds, 6),
+        'files_per_sec': round(config['java_files'] / total_seconds, 2) if total_seconds else None,
+        'breakdown': {part: round(value, 6) for part, value in breakdown.items()},
+        'peak_rss_kb': get_peak_rss_kb(),
+        'stages': stages,
+    }
@@ -0,0 +1,183 @@
+import os
+from typing import Dict
+
+ProjectConfig = Dict[str, object]
+
+DEFAULT_CONFIG: ProjectConfig = {
+    'group_id': 'io.bench',
+    'artifact_id': 'app',
+    'services': 20,
+    'methods': 10,
+    'fields': 3,
+    'controllers': 20,
+    'repositories': 20,
+    'entities': 20,
+    'lombok': True,
+}
+
+
+def get_pom(config: ProjectConfig) -> str:
+    lombok = ''
+    if config['lombok']:
+        lombok = '''
+        <dependency>
+            <groupId>org.projectlombok</groupId>
+            <artifactId>lombok</artifactId>
+            <optional>true</optional>
+        </dependency>'''
+
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <modelVersion>4.0.0</modelVersion>
+    <groupId>{config['group_id']}</groupId>
+    <artifactId>{config['artifact_id']}</artifactId>
+    <version>1.0.0</version>
+    <dependencies>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-web</artifactId>
+        </dependency>{lombok}
+    </dependencies>
+</project>
+'''
+
+
+def get_entity(package: str, index: int, config: ProjectConfig) -> str:
+    fields = '\n'.join(f'    private String field{field};' for field in range(config['fields']))
+    return f'''package {package}.model;
+
+import java.time.LocalDateTime;
+
+public class Entity{index}Model {{
+    private Long id;
+{fields}
+    private LocalDateTime createdAt;
+
+    public Long getId() {{
+        return id;
+    }}
+}}
+'''
+
+
+def get_repository(package: str, index: int) -> str:
+    return f'''package {package}.repository;
+
+import {package}.model.Entity{index}Model;
+import org.springframework.data.jpa.repository.JpaRepository;
+
+public interface Entity{index}Repository extends JpaRepository<Entity{index}Model, Long> {{
+}}
+'''
+
+
+def get_service(package: str, index: int, config: ProjectConfig) -> str:
+    entity = f'Entity{index % max(1, config["entities"])}'
+    fields = [f'    private final {entity}Repository repository;']
+    fields += [f'    private final String option{field};' for field in range(config['fields'])]
+    assignments = '\n'.join(f'        this.option{field} = "{field}";' for field in range(config['fields']))
+
+    methods = []
+    for method in range(config['methods']):
+        methods.append(f'''    /**
+     * Operação {method} do serviço {index}.
+     */
+    @Transactional(readOnly = true)
+    public List<{entity}Model> operation{method}(Long id, String filter) {{
+        if (id == null) {{
+            throw new IllegalArgumentException("id {{}} inválido");
+        }}
+        List<{entity}Model> result = repository.findAll();
+        for ({entity}Model model : result) {{
+            helper(model);
+        }}
+        return result;
+    }}
+''')
+
+    return f'''package {package}.services;
+
+import {package}.model.{entity}Model;
+import {package}.repository.{entity}Repository;
+import java.util.List;
+
+public class Item{index}Service {{
+{chr(10).join(fields)}
+
+    public Item{index}Service({entity}Repository repository) {{
+        this.repository = repository;
+{assignments}
+    }}
+
+{chr(10).join(methods)}
+    private void helper({entity}Model model) {{
+        model.getId();
+    }}
+}}
+'''
+
+
+def get_controller(package: str, index: int, config: ProjectConfig) -> str:
+    service = f'Item{index % max(1, config["services"])}Service'
+    methods = []
+    for method in range(config['methods']):
+        methods.append(f'''    @GetMapping("/items/{index}/{method}")
+    public ResponseEntity<Object> operation{method}(@RequestParam Long id, @RequestParam String filter) {{
+        return ResponseEntity.ok(service.operation{method}(id, filter));
+    }}
+''')
+
+    return f'''package {package}.controller;
+
+import {package}.services.{service};
+import org.springframework.http.ResponseEntity;
+import org.springframework.web.bind.annotation.*;
+
+@RestController
+public class Item{index}Controller {{
+    private final {service} service;
+
+    public Item{index}Controller({service} service) {{
+        this.service = service;
+    }}
+
+{chr(10).join(methods)}}}
+'''
+
+
+def write_file(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def generate_project(destination: str, config: ProjectConfig = None) -> ProjectConfig:
+    """
+    Gera um projeto Maven/Spring sintético com serviços, controllers, repositórios e entidades.
+    Retorna a configuração usada, com o total de arquivos .java gerados.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    package = f"{config['group_id']}.{config['artifact_id']}"
+    source_root = os.path.join(destination, 'src', 'main', 'java', *config['group_id'].split('.'),
+                               config['artifact_id'])
+
+    write_file(os.path.join(destination, 'pom.xml'), get_pom(config))
+
+    for index in range(config['entities']):
+        write_file(os.path.join(source_root, 'model', f'Entity{index}Model.java'), get_entity(package, index, config))
+    for index in range(config['repositories']):
+        write_file(os.path.join(source_root, 'repository', f'Entity{index}Repository.java'),
+                   get_repository(package, index))
+    for index in range(config['services']):
+        write_file(os.path.join(source_root, 'services', f'Item{index}Service.java'), get_service(package, index, config))
+    for index in range(config['controllers']):
+        write_file(os.path.join(source_root, 'controller', f'Item{index}Controller.java'),
+                   get_controller(package, index, config))
+
+    write_file(os.path.join(source_root, 'dto', 'ItemDto.java'), f'package {package}.dto;\n\npublic class ItemDto {{\n}}\n')
+    write_file(os.path.join(source_root, 'config', 'AppConfig.java'),
+               f'package {package}.config;\n\npublic class AppConfig {{\n}}\n')
+
+    config['java_files'] = (config['entities'] + config['repositories'] + config['services']
+                            + config['controllers'] + 2)
+    return config
@@ -0,0 +1,124 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from src.benchmark import benchmark
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tempo máximo, em milissegundos, para importar o main.py (inicialização da ferramenta)
+DEFAULT_BUDGET_MS = 150
+
+# Módulos que só podem ser carregados quando uma etapa ou opção que os usa é executada
+LAZY_MODULES = (
+    'javalang',
+    'jinja2',
+    'xmltodict',
+    'multiprocessing',
+    'concurrent.futures',
+    'difflib',
+    'src.controller.controller',
+    'src.repository.repositories',
+    'src.repository.repositories_impl',
+    'src.structure.infra_config',
+    'src.structure.domain_config',
+    'src.structure.data_config',
+    'src.structure.references',
+    'src.usecase.usecases',
+    'src.usecase.usecases_impl',
+)
+
+# Linha do -X importtime: "import time: self [us] | cumulative | imported package"
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$')
+
+ImportRecord = Dict[str, object]
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Obtém os módulos importados, com o tempo próprio e o acumulado (em microssegundos)
+    e o nível de aninhamento, a partir da saída do -X importtime.
+    """
+    records = []
+    for line in output.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match is not None:
+            records.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': len(match.group(3)) // 2,
+            })
+    return records
+
+
+def run_importtime(module_name: str = 'main') -> List[ImportRecord]:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+                            capture_output=True, text=True, cwd=PROJECT_DIR, check=True)
+    return parse_importtime(result.stderr)
+
+
+def get_import_ms(records: List[ImportRecord], module_name: str = 'main') -> float:
+    return next((record['cumulative_us'] for record in records if record['module'] == module_name), 0) / 1000
+
+
+def get_eager_modules(records: List[ImportRecord]) -> List[str]:
+    """
+    Obtém os módulos de LAZY_MODULES (ou seus submódulos) carregados na inicialização.
+    """
+    imported = {record['module'] for record in records}
+    return [
+        name for name in LAZY_MODULES
+        if any(module == name or module.startswith(f'{name}.') for module in imported)
+    ]
+
+
+def measure_help_ms(runs: int) -> float:
+    """
+    Mede o tempo total (mediana) de "main.py --help", incluindo a inicialização do interpretador.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'main.py', '--help'], capture_output=True, cwd=PROJECT_DIR, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def run_startup_benchmark(runs: int = 5, budget_ms: Optional[float] = DEFAULT_BUDGET_MS, top: int = 10) -> Dict:
+    """
+    Mede a inicialização da ferramenta com -X importtime em processos novos: tempo de importação
+    do main.py (mediana), módulos mais lentos e módulos pesados carregados antes do uso.
+    Retorna o resultado em formato serializável (JSON), com as violações do orçamento.
+    """
+    measurements = [run_importtime() for _ in range(runs)]
+    measurements.sort(key=get_import_ms)
+    median_records = measurements[len(measurements) // 2]
+    import_ms = get_import_ms(median_records)
+    eager_modules = get_eager_modules(median_records)
+
+    violations = []
+    if budget_ms is not None and import_ms > budget_ms:
+        violations.append(f"Importação do main.py em {import_ms:.1f} ms (orçamento: {budget_ms} ms)")
+    for name in eager_modules:
+        violations.append(f"Módulo carregado na inicialização: {name}")
+
+    slowest = sorted(median_records, key=lambda record: record['self_us'], reverse=True)[:top]
+    return {
+        'commit': benchmark.get_git_commit(),
+        'runs': runs,
+        'import_ms': round(import_ms, 3),
+        'help_ms': round(measure_help_ms(runs), 3),
+        'budget_ms': budget_ms,
+        'top_modules': [
+            {'module': record['module'], 'self_ms': record['self_us'] / 1000,
+             'cumulative_ms': record['cumulative_us'] / 1000}
+            for record in slowest
+        ],
+        'eager_modules': eager_modules,
+        'violations': violations,
+    }
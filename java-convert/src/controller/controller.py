@@ -1,8 +1,13 @@
+import functools
 import os
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-import javalang
-from jinja2 import Template
-from src.utils import pom_info, util
+from src.usecase import rendering
+from src.utils import events, java_model, output_writer, parallel, profiler, project_layout, restructure, \
+    symbol_index, templates, util
+
+SERVICE_SUFFIX = 'Service'
 
 
 def get_controller_path(source_root: str) -> str:
@@ -13,26 +18,187 @@ def get_controller_path(source_root: str) -> str:
             return path
 
 
-def refactor_controllers(source_directory: str):
-    source_root = pom_info.get_dir_source_code_path(source_directory)
+def get_controller_template():
+    return templates.get_template('controller_template.jinja')
+
+
+def get_class_annotations(code: str, class_name: str) -> List[str]:
+    """
+    Obtém as anotações da declaração da classe (@RestController, @RequestMapping...).
+    """
+    match = re.search(rf'\bclass\s+{re.escape(class_name)}\b', code)
+    if match is None:
+        return []
+    header = code[:match.start()]
+    header = rendering.COMMENT_PATTERN.sub('', header[header.rfind(';') + 1:])
+    return rendering.ANNOTATION_PATTERN.findall(header)
+
+
+def get_use_case(service_name: str, method_name: str, grouping: str) -> Tuple[str, str]:
+    """
+    Obtém o tipo e o nome do campo do caso de uso gerado para o método do serviço.
+    """
+    if grouping == 'class':
+        use_case_type = f"{service_name}UseCase"
+    else:
+        use_case_type = f"{method_name[0].upper() + method_name[1:]}{service_name}UseCase"
+    return use_case_type, use_case_type[0].lower() + use_case_type[1:]
+
+
+def get_contracts_package(model: java_model.FileRecord, service_type: str, source_file: str,
+                          contracts_path: str) -> str:
+    """
+    Obtém o pacote dos contratos dos casos de uso do serviço, como no template dos casos de uso.
+    Sem o import do serviço, usa o pacote de data/contracts.
+    """
+    service_name = service_type[:-len(SERVICE_SUFFIX)]
+    for record in model.imports:
+        if java_model.get_imported_type(record) == service_type:
+            service_package = record.path.rsplit('.', 1)[0]
+            return f"{service_package.replace('services', 'data.contracts')}.{service_name.lower()}"
+
+    package_name = model.package_name or ''
+    contracts_package = restructure.get_moved_package(package_name, os.path.dirname(source_file),
+                                                      contracts_path) or package_name
+    return f"{contracts_package}.{service_name.lower()}"
+
+
+def get_service_methods(models: List[java_model.FileRecord]) -> Dict[str, FrozenSet[str]]:
+    """
+    Obtém, por serviço, os nomes dos métodos que geram casos de uso (os mesmos de usecases).
+    """
+    return {
+        model.class_name: frozenset(
+            method.name for class_info in model.classes for method in rendering.get_public_methods(model, class_info)
+        )
+        for model in models if model.class_name
+    }
+
+
+def render_controller(item: Tuple[str, java_model.FileRecord], source_path: str, destination_path: str,
+                      contracts_path: str, acitive_lombook: bool, service_methods: Dict[str, FrozenSet[str]],
+                      grouping: str = 'method') -> Optional[Tuple[str, str]]:
+    """
+    Renderiza o controller em presentation/controllers: as chamadas aos métodos públicos dos
+    serviços passam a usar os casos de uso gerados em data.contracts, e cada serviço dá lugar
+    aos casos de uso que usa. As demais chamadas (métodos sem caso de uso) não são alteradas.
+    item é (arquivo de origem, modelo). Retorna (arquivo de destino, código renderizado),
+    ou None se o arquivo não declara um controller.
+    """
+    source_file, model = item
+    class_info = next((info for info in model.classes if info.name == model.class_name), None)
+    if class_info is None:
+        return None
+
+    # Campos de serviço: nome do campo -> tipo
+    services = {
+        field.name: field.type for field in class_info.fields
+        if field.type.endswith(SERVICE_SUFFIX) and len(field.type) > len(SERVICE_SUFFIX)
+    }
+    # Casos de uso usados, por serviço, na ordem da primeira chamada: nome do campo -> tipo
+    use_cases: Dict[str, Dict[str, str]] = {field_name: {} for field_name in services}
+
+    method_texts = []
+    for method in java_model.get_class_methods(model, class_info):
+        text = java_model.get_method_text(model, method)
+        for field_name, service_type in services.items():
+            def replace_call(match, field_name=field_name, service_type=service_type):
+                method_name = match.group(1)
+                if method_name not in service_methods.get(service_type, ()):
+                    return match.group(0)
+                use_case_type, use_case_field = get_use_case(
+                    service_type[:-len(SERVICE_SUFFIX)], method_name, grouping
+                )
+                use_cases[field_name].setdefault(use_case_field, use_case_type)
+                return f"{use_case_field}.{method_name}("
+
+            text = re.sub(rf'\b{re.escape(field_name)}\s*\.\s*(\w+)\s*\(', replace_call, text)
+        method_texts.append(text)
+    method_code = "\n\n".join(method_texts)
+
+    dependencies = []
+    use_case_imports = []
+    for field in class_info.fields:
+        if field.name not in services:
+            dependencies.append(field)
+            continue
+
+        contracts_package = get_contracts_package(model, field.type, source_file, contracts_path)
+        for use_case_field, use_case_type in use_cases[field.name].items():
+            dependencies.append(java_model.FieldRecord(use_case_type, use_case_field))
+            use_case_imports.append(f"{contracts_package}.{use_case_type}")
+        # O serviço continua como dependência se ainda é usado de outra forma
+        if re.search(rf'\b{re.escape(field.name)}\b', method_code):
+            dependencies.append(field)
+
+    used_types = rendering.get_used_names(method_code) | {field.type for field in dependencies}
+    removed_services = set(services.values()) - used_types
+    imports = [
+        java_model.format_import(record) for record in model.imports
+        if java_model.get_imported_type(record) not in removed_services
+    ]
+
+    # Subpacotes abaixo do pacote de controllers são mantidos no destino
+    relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(source_file)), os.path.abspath(source_path))
+    destination_dir = os.path.normpath(os.path.join(destination_path, relative_dir))
+    package_name = model.package_name or ''
+    package_name = restructure.get_moved_package(package_name, os.path.dirname(source_file),
+                                                 destination_dir) or package_name
+    destination_file = os.path.join(destination_dir, f"{model.class_name}.java")
+
+    profiler.count('templates_rendered')
+    with profiler.span('jinja.render', 'render'):
+        rendered_template = get_controller_template().render(
+            package_name=package_name,
+            controller_name=model.class_name,
+            annotations=get_class_annotations(model.code, model.class_name),
+            fields=[java_model.format_field(field) for field in dependencies],
+            dependencies=dependencies,
+            use_case_imports=use_case_imports,
+            imports=imports,
+            method_code=method_code,
+            acitive_lombook=acitive_lombook,
+        )
+    return destination_file, rendered_template
+
+
+def refactor_controllers(source_directory: str, java_files: List[str] = None):
+    """
+    Cria os controllers em presentation/controllers a partir dos controllers existentes.
+    Os arquivos são renderizados em paralelo e gravados a cada lote de resultados; os modelos
+    analisados de todos os controllers ficam em memória durante a etapa.
+    Quando java_files é informado, apenas esses arquivos são processados.
+    """
+    layout = project_layout.get_project_layout(source_directory)
+    source_root = layout['source_root']
     source_path = get_controller_path(source_root)
     destiny_path = os.path.join(source_root, "presentation", "controllers")
-    java_files = util.get_java_files(source_path)
-
-    print(source_path)
+    if java_files is None:
+        java_files = project_layout.get_java_files(layout, source_path)
 
-    for source_file in java_files:
-        package_name, class_name, tree, codelines = util.process_java_file(source_file)
+    # Métodos dos serviços com casos de uso gerados, para reescrever apenas essas chamadas
+    service_files = project_layout.get_java_files(layout, os.path.join(source_root, "services"))
+    service_methods = get_service_methods([util.get_java_model(unit) for unit in util.load_java_units(service_files)])
 
-        # print(f' data: {codelines}')
-        # print(f'É uma classe?{util.is_classe(tree)}')
-        # if util.is_classe(tree):
-        #     file_name = util.get_class_name(tree)
-        #     print(f'Nome da classe: {file_name}')
-        #     # util.copy_file(source_path, destiny_path, file_name)
+    units = util.load_java_units(java_files)
+    render = functools.partial(
+        render_controller,
+        source_path=source_path,
+        destination_path=destiny_path,
+        contracts_path=os.path.join(source_root, "data", "contracts"),
+        acitive_lombook=layout['lombok'],
+        service_methods=service_methods,
+        grouping=rendering.get_settings()['grouping'],
+    )
 
-        imports = util.extract_imports(tree)
+    written = 0
+    items = [(unit['path'], util.get_java_model(unit)) for unit in units]
+    for unit, result in zip(units, parallel.imap_files(render, items)):
+        if result is None:
+            continue
+        destination_file, rendered_template = result
+        if output_writer.write_file(destination_file, rendered_template) == output_writer.WRITTEN:
+            written += 1
+        symbol_index.record_output(destination_file, unit['path'], 'refactor_controller')
 
-        for path, node in tree.filter(javalang.tree.ClassDeclaration):
-            fields = util.extract_fields(node)
-            dependencies = util.extract_dependencies(node)
+    events.emit('summary', f"Controllers: {written} gerados em {destiny_path}", count=written)
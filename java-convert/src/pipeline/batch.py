@@ -0,0 +1,56 @@
+import time
+from typing import List
+
+from src.pipeline import pipeline, reactor
+from src.utils import disk_cache, events, output_writer, restructure, symbol_index, util
+
+
+def run_project(project_path: str, options: dict, use_cache: bool = True,
+                incremental: bool = False) -> reactor.ModuleSummary:
+    """
+    Executa o pipeline em um projeto do lote, no processo atual: os módulos importados e os
+    templates compilados são reaproveitados entre os projetos. Os processos de trabalho são
+    criados a cada etapa, como na execução de um único projeto.
+    O estado de um projeto (arquivos analisados, estatísticas, tipos realocados) não passa ao próximo.
+    """
+    util.clear_java_units()
+    output_writer.reset()
+    disk_cache.reset_stats()
+    restructure.reset_renames()
+    if use_cache:
+        disk_cache.enable_cache(project_path)
+    else:
+        disk_cache.disable_cache()
+
+    error = None
+    start = time.perf_counter()
+    with events.context(project=project_path):
+        try:
+            if incremental:
+                symbol_index.load_index()
+            pipeline.run_pipeline(project_path, options, list(options), incremental)
+        except Exception as exception:
+            error = f'{type(exception).__name__}: {exception}'
+            events.emit('error', f"{project_path}: {error}", level='error')
+
+    return {
+        'module': project_path,
+        'seconds': time.perf_counter() - start,
+        'files': output_writer.get_stats(),
+        'cache': disk_cache.get_stats(),
+        'error': error,
+    }
+
+
+def run_batch(project_paths: List[str], options: dict, use_cache: bool = True,
+              incremental: bool = False) -> List[reactor.ModuleSummary]:
+    """
+    Executa o pipeline em vários projetos, um após o outro, em um único processo: o custo de
+    inicialização (interpretador, importações, templates) é pago uma única vez para todo o lote.
+    Um erro em um projeto é registrado no resumo e não interrompe os demais.
+    """
+    summaries = []
+    for project_path in project_paths:
+        events.emit('project', f"== {project_path}", project=project_path)
+        summaries.append(run_project(project_path, options, use_cache, incremental))
+    return summaries
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional, Union
+
+from src.usecase import rendering
+from src.utils import events, lazy, output_writer, profiler, project_layout, symbol_index, templates, util
+
+Stage = Dict[str, Union[Callable, str, List[str], None]]
+
+
+def get_services_path(source_root: str) -> str:
+    return os.path.join(source_root, "services")
+
+
+# Etapas do pipeline, na ordem padrão de execução.
+# 'function' e 'source_path' são referências 'modulo:funcao', resolvidas apenas quando a etapa
+# é usada: os módulos das etapas (e o javalang, o jinja2...) não são carregados na inicialização.
+# 'source_path' indica de qual diretório a etapa lê arquivos .java (para a análise antecipada),
+# 'scan' se ela precisa da análise completa ('unit') ou apenas do cabeçalho ('header') dos arquivos
+# e 'after' as etapas que, quando ativas, precisam terminar antes dela.
+STAGES: Dict[str, Stage] = {
+    'refactor_use_cases': {
+        'function': 'src.usecase.usecases:refactor_use_cases',
+        'source_path': get_services_path,
+        'scan': 'unit',
+        'after': [],
+    },
+    'refactor_impl': {
+        'function': 'src.usecase.usecases_impl:refactor_use_cases_impl',
+        'source_path': get_services_path,
+        'scan': 'unit',
+        'after': ['refactor_use_cases'],
+    },
+    'refactor_controller': {
+        'function': 'src.controller.controller:refactor_controllers',
+        'source_path': 'src.controller.controller:get_controller_path',
+        'scan': 'unit',
+        'after': ['refactor_use_cases'],
+    },
+    'refactor_repository': {
+        'function': 'src.repository.repositories:refactor_or_create_repositories',
+        'source_path': 'src.repository.repositories:get_repository_path',
+        'scan': 'header',
+        'after': [],
+    },
+    'refactor_repository_impl': {
+        'function': 'src.repository.repositories_impl:refactor_repository_impl',
+        'source_path': 'src.repository.repositories:get_repository_path',
+        'scan': 'header',
+        'after': ['refactor_repository'],
+    },
+    'refactor_infrastructure': {
+        'function': 'src.structure.infra_config:refactor_infrastructure',
+        'source_path': None,
+        'scan': None,
+        'after': [],
+    },
+    'refactor_domain': {
+        'function': 'src.structure.domain_config:refactor_domain',
+        'source_path': None,
+        'scan': None,
+        'after': [],
+    },
+    'refactor_data': {
+        'function': 'src.structure.data_config:refactor_data',
+        'source_path': None,
+        'scan': None,
+        'after': [],
+    },
+    'refactor_references': {
+        'function': 'src.structure.references:refactor_references',
+        'source_path': None,
+        'scan': None,
+        'after': ['refactor_use_cases', 'refactor_impl', 'refactor_controller', 'refactor_repository',
+                  'refactor_repository_impl', 'refactor_infrastructure', 'refactor_domain', 'refactor_data'],
+    },
+}
+
+
+def get_stage_function(name: str) -> Callable:
+    """
+    Obtém a função da etapa, importando o módulo dela no primeiro uso.
+    """
+    return lazy.resolve(STAGES[name]['function'])
+
+
+def get_stage_source_path(name: str, source_root: str) -> Optional[str]:
+    """
+    Obtém o diretório do qual a etapa lê arquivos .java, ou None se ela não lê arquivos.
+    """
+    get_source_path = STAGES[name]['source_path']
+    if get_source_path is None:
+        return None
+    return lazy.resolve(get_source_path)(source_root)
+
+
+def run_stage_files(name: str, source_directory: str, java_files: List[str]):
+    """
+    Executa a etapa apenas para os arquivos informados e remove os arquivos que eles geravam
+    e não geram mais (ex.: os casos de uso de um método renomeado), segundo o índice de símbolos.
+    """
+    previous_outputs = symbol_index.take_outputs(java_files, name)
+    get_stage_function(name)(source_directory, java_files=java_files)
+    for output_file in symbol_index.get_stale_outputs(previous_outputs):
+        output_writer.remove_file(output_file)
+
+
+def get_stage_order(stage_names: List[str]) -> List[str]:
+    """
+    Ordena as etapas ativas respeitando as dependências ('after').
+    Entre etapas independentes, mantém a ordem em que foram informadas.
+    """
+    pending = [name for name in stage_names if name in STAGES]
+    order = []
+    while pending:
+        for name in pending:
+            if all(dependency in order or dependency not in pending for dependency in STAGES[name]['after']):
+                order.append(name)
+                pending.remove(name)
+                break
+        else:
+            raise ValueError(f"Dependência circular entre as etapas: {', '.join(pending)}")
+    return order
+
+
+def route_java_files(layout: project_layout.ProjectLayout, stage_names: List[str], scan: str) -> List[str]:
+    """
+    Obtém, da varredura única do projeto, os arquivos .java lidos pelas etapas informadas
+    com o tipo de análise informado ('unit' ou 'header').
+    """
+    java_files = []
+    for name in stage_names:
+        if STAGES[name]['source_path'] is not None and STAGES[name]['scan'] == scan:
+            source_path = get_stage_source_path(name, layout['source_root'])
+            java_files.extend(project_layout.get_java_files(layout, source_path))
+    return list(dict.fromkeys(java_files))
+
+
+def get_fingerprint(layout: project_layout.ProjectLayout, stage_names: List[str]) -> str:
+    """
+    Obtém o hash da configuração que influencia o código gerado: etapas ativas,
+    recursos do pom.xml, agrupamento dos casos de uso e conteúdo dos templates.
+    """
+    environment = templates.get_environment()
+    template_sources = {
+        name: environment.loader.get_source(environment, name)[0]
+        for name in environment.list_templates(extensions=['jinja'])
+    }
+    content = json.dumps([stage_names, layout['pom']['features'], rendering.get_settings(), template_sources],
+                         sort_keys=True)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def run_pipeline(source_directory: str, options: dict, stage_names: Optional[List[str]] = None,
+                 incremental: bool = False):
+    """
+    Executa as etapas ativas: resolve o layout do projeto e varre o código uma única vez,
+    analisa de uma vez (em paralelo) todos os arquivos lidos pelas etapas e executa as etapas
+    na ordem das dependências.
+    No modo incremental, as etapas que analisam arquivos processam apenas os arquivos afetados
+    pelas alterações desde a última execução, segundo o índice de símbolos, e os arquivos gerados
+    que não são mais produzidos (de métodos ou arquivos de origem removidos) são apagados.
+    """
+    stage_names = stage_names or list(STAGES)
+    enabled = get_stage_order([name for name in stage_names if options.get(name)])
+
+    with profiler.span('pipeline.prepare', 'stage'):
+        layout = project_layout.load_project_layout(source_directory)
+        units = util.load_java_units(route_java_files(layout, enabled, 'unit'))
+        util.load_java_headers(route_java_files(layout, enabled, 'header'))
+        affected = None
+        if incremental:
+            symbol_index.set_fingerprint(get_fingerprint(layout, enabled))
+            affected = symbol_index.update_files(units)
+            for output_file in symbol_index.take_orphan_outputs():
+                output_writer.remove_file(output_file)
+
+    for name in enabled:
+        with profiler.span(f'stage.{name}', 'stage'), events.stage(name):
+            if affected is not None and STAGES[name]['scan'] == 'unit':
+                java_files = [path for path in route_java_files(layout, [name], 'unit') if path in affected]
+                run_stage_files(name, source_directory, java_files)
+            else:
+                get_stage_function(name)(source_directory)
+
+    if incremental:
+        symbol_index.save_index()
@@ -0,0 +1,149 @@
+import contextlib
+import functools
+import io
+import os
+import time
+from typing import Dict, List
+
+from src.pipeline import pipeline
+from src.utils import disk_cache, events, output_writer, parallel, pom_info, restructure, templates
+
+ModuleSummary = Dict[str, object]
+
+
+def discover_modules(project_source_path: str) -> List[pom_info.PomProject]:
+    """
+    Obtém os módulos do reactor a partir do pom.xml raiz, descendo pelos agregadores
+    (packaging pom com <modules>). Um projeto sem módulos é o seu próprio único módulo.
+    """
+    pom = pom_info.load_pom(project_source_path)
+    if not pom['modules']:
+        return [pom]
+
+    modules = []
+    for module_path in pom_info.get_module_paths(pom):
+        if os.path.isfile(os.path.join(module_path, 'pom.xml')):
+            modules.extend(discover_modules(module_path))
+    return modules
+
+
+def get_module_key(pom: pom_info.PomProject) -> str:
+    return f"{pom['group_id']}:{pom['artifact_id']}"
+
+
+def get_module_waves(modules: List[pom_info.PomProject]) -> List[List[pom_info.PomProject]]:
+    """
+    Agrupa os módulos em ondas pelo grafo de dependências entre eles: os módulos de uma onda
+    dependem apenas de módulos das ondas anteriores e podem ser processados em paralelo.
+    """
+    by_key = {get_module_key(module): module for module in modules}
+    dependencies = {
+        get_module_key(module): {
+            key for key in (f"{dependency['group_id']}:{dependency['artifact_id']}"
+                            for dependency in module['dependencies'])
+            if key in by_key and key != get_module_key(module)
+        }
+        for module in modules
+    }
+
+    waves = []
+    done = set()
+    pending = list(by_key)
+    while pending:
+        wave = [key for key in pending if dependencies[key] <= done]
+        if not wave:
+            raise ValueError(f"Dependência circular entre os módulos: {', '.join(pending)}")
+        waves.append([by_key[key] for key in wave])
+        done.update(wave)
+        pending = [key for key in pending if key not in done]
+    return waves
+
+
+def run_module(module_path: str, options: dict, jobs: int) -> ModuleSummary:
+    """
+    Executa o pipeline em um módulo. Pode ser executada em um processo filho:
+    a saída é capturada e retornada no resumo, junto com as estatísticas do módulo.
+    Cada módulo usa o seu próprio cache em disco, já que o cache também guarda o estado
+    do módulo (tipos realocados, índice de símbolos), que não pode ser compartilhado.
+    """
+    parallel.set_jobs(jobs)
+    output_writer.reset()
+    disk_cache.reset_stats()
+    restructure.reset_renames()
+    events.reset()
+    if disk_cache.is_enabled():
+        disk_cache.enable_cache(module_path, read_only=disk_cache.is_read_only())
+
+    log = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        try:
+            pipeline.run_pipeline(module_path, options, list(options))
+        except Exception as exception:
+            error = f'{type(exception).__name__}: {exception}'
+        # As mensagens são gravadas em segundo plano: aguarda antes de encerrar a captura
+        events.flush()
+
+    records, stages = events.get_records()
+    events.reset()
+    return {
+        'module': module_path,
+        'seconds': time.perf_counter() - start,
+        'files': output_writer.get_stats(),
+        'cache': disk_cache.get_stats(),
+        'error': error,
+        'log': log.getvalue(),
+        'events': records,
+        'stages': stages,
+    }
+
+
+def warm_up_templates():
+    """
+    Compila os templates no processo principal antes de criar os processos filhos.
+    """
+    for template_name in templates.get_environment().list_templates(extensions=['jinja']):
+        templates.get_template(template_name)
+
+
+def run_reactor(project_source_path: str, options: dict) -> List[ModuleSummary]:
+    """
+    Executa o pipeline em todos os módulos do reactor, em paralelo dentro de cada onda.
+    """
+    jobs = parallel.get_jobs()
+    waves = get_module_waves(discover_modules(project_source_path))
+    warm_up_templates()
+
+    summaries = []
+    for wave in waves:
+        module_paths = [module['project_dir'] for module in wave]
+        # Com um único módulo na onda, o paralelismo fica por conta dos arquivos do módulo
+        module_jobs = jobs if len(module_paths) == 1 else 1
+        run = functools.partial(run_module, options=options, jobs=module_jobs)
+        summaries.extend(parallel.map_files(run, module_paths))
+        parallel.set_jobs(jobs)
+    return summaries
+
+
+def format_summary(summaries: List[ModuleSummary], base_path: str) -> str:
+    """
+    Formata o resumo consolidado da execução do reactor.
+    """
+    lines = [f"{'Módulo':<40} {'Tempo (s)':>10} {'Gravados':>9} {'Inalterados':>12} {'Ignorados':>10} "
+             f"{'Cache':>9}  Status"]
+    totals = {output_writer.WRITTEN: 0, output_writer.UNCHANGED: 0, output_writer.SKIPPED: 0}
+    for summary in summaries:
+        files = summary['files']
+        cache = summary['cache']
+        for status in totals:
+            totals[status] += files[status]
+        module_name = os.path.relpath(summary['module'], base_path)
+        lines.append(f"{module_name:<40} {summary['seconds']:>10.2f} {files[output_writer.WRITTEN]:>9} "
+                     f"{files[output_writer.UNCHANGED]:>12} {files[output_writer.SKIPPED]:>10} "
+                     f"{cache['hits']:>4}/{cache['misses']:<4}  {summary['error'] or 'ok'}")
+
+    failed = sum(1 for summary in summaries if summary['error'])
+    lines.append(f"Total: {len(summaries)} módulos ({failed} com erro), {totals[output_writer.WRITTEN]} gravados, "
+                 f"{totals[output_writer.UNCHANGED]} inalterados, {totals[output_writer.SKIPPED]} ignorados")
+    return '\n'.join(lines)
@@ -0,0 +1,120 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.pipeline import pipeline
+from src.utils import events, file_discovery, output_writer, project_layout, symbol_index, util
+
+# Estado de cada arquivo observado: (mtime, tamanho)
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def get_watched_paths(layout: project_layout.ProjectLayout, stage_names: List[str]) -> List[str]:
+    """
+    Obtém os diretórios lidos pelas etapas ativas (services, controller, repository...).
+    """
+    paths = []
+    for name in stage_names:
+        source_path = pipeline.get_stage_source_path(name, layout['source_root'])
+        if source_path is not None and source_path not in paths:
+            paths.append(source_path)
+    return paths
+
+
+def take_snapshot(paths: List[str], pom_path: str) -> Snapshot:
+    """
+    Obtém o mtime e o tamanho do pom.xml e dos arquivos .java dos diretórios observados.
+    """
+    snapshot = {}
+    for path in paths:
+        for source_file in file_discovery.iter_files(path, ignore_root=os.path.dirname(pom_path)):
+            stat = file_discovery.get_stat(os.path.abspath(source_file))
+            snapshot[source_file] = (stat.st_mtime_ns, stat.st_size)
+
+    stat = os.stat(pom_path)
+    snapshot[pom_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def get_changed_files(old: Snapshot, new: Snapshot) -> List[str]:
+    """
+    Obtém os arquivos criados, alterados ou removidos entre dois snapshots.
+    """
+    return sorted({path for path, state in new.items() if old.get(path) != state} | (old.keys() - new.keys()))
+
+
+def regenerate(source_directory: str, stage_names: List[str], changed_files: List[str]) -> Dict[str, List[str]]:
+    """
+    Executa novamente, apenas para os arquivos alterados e os que dependem deles (pelo índice
+    de símbolos), as etapas que leem esses arquivos. As saídas dos arquivos removidos são apagadas,
+    como no modo incremental. Retorna os arquivos processados por etapa.
+    """
+    layout = project_layout.get_project_layout(source_directory)
+    java_files = [path for path in changed_files if path.endswith('.java') and os.path.isfile(path)]
+    removed_files = [path for path in changed_files if path.endswith('.java') and not os.path.isfile(path)]
+    project_layout.update_java_files(layout, java_files, removed_files)
+    # Os dependentes dos arquivos removidos são obtidos antes de eles saírem do índice
+    affected = symbol_index.get_dependents(os.path.abspath(path) for path in removed_files)
+    affected |= symbol_index.update_files(util.load_java_units(java_files)) | set(changed_files)
+    for output_file in symbol_index.take_orphan_outputs():
+        output_writer.remove_file(output_file)
+    changed_files = sorted(path for path in affected if os.path.isfile(path))
+    processed = {}
+    for name in stage_names:
+        source_path = pipeline.get_stage_source_path(name, layout['source_root'])
+        if source_path is None:
+            continue
+
+        prefix = os.path.join(source_path, '')
+        java_files = [path for path in changed_files if path.startswith(prefix)]
+        if java_files:
+            pipeline.run_stage_files(name, source_directory, java_files)
+            processed[name] = java_files
+    return processed
+
+
+def watch(source_directory: str, options: dict, interval: float = 0.5, max_cycles: Optional[int] = None):
+    """
+    Executa o pipeline completo e, a cada alteração nos arquivos observados, regenera apenas
+    as saídas dos arquivos alterados. Os arquivos analisados, o pom.xml e os templates ficam
+    em memória entre as execuções. Uma alteração no pom.xml executa o pipeline completo novamente.
+    """
+    stage_names = pipeline.get_stage_order([name for name in options if options.get(name) and name in pipeline.STAGES])
+    pom_path = os.path.abspath(os.path.join(source_directory, 'pom.xml'))
+
+    symbol_index.load_index()
+    pipeline.run_pipeline(source_directory, options, list(options), incremental=True)
+    layout = project_layout.get_project_layout(source_directory)
+    watched_paths = get_watched_paths(layout, stage_names)
+    snapshot = take_snapshot(watched_paths, pom_path)
+    events.emit('watch', f"Observando {', '.join(watched_paths)} (Ctrl+C para sair)", paths=watched_paths)
+
+    cycles = 0
+    while max_cycles is None or cycles < max_cycles:
+        cycles += 1
+        time.sleep(interval)
+        new_snapshot = take_snapshot(watched_paths, pom_path)
+        changed_files = get_changed_files(snapshot, new_snapshot)
+        snapshot = new_snapshot
+        if not changed_files:
+            continue
+
+        start = time.perf_counter()
+        stats_before = output_writer.get_stats()
+        if pom_path in changed_files:
+            events.emit('watch', 'pom.xml alterado: executando o pipeline completo')
+            pipeline.run_pipeline(source_directory, options, list(options), incremental=True)
+            layout = project_layout.get_project_layout(source_directory)
+            watched_paths = get_watched_paths(layout, stage_names)
+            snapshot = take_snapshot(watched_paths, pom_path)
+        else:
+            processed = regenerate(source_directory, stage_names, changed_files)
+            for name, java_files in processed.items():
+                events.emit('regenerated', f"{name}: {', '.join(os.path.basename(path) for path in java_files)}",
+                            stage=name, paths=java_files)
+            symbol_index.save_index()
+
+        stats = output_writer.get_stats()
+        written = stats[output_writer.WRITTEN] - stats_before[output_writer.WRITTEN]
+        events.emit('watch', f"Regenerado em {(time.perf_counter() - start) * 1000:.0f} ms ({written} arquivos gravados)",
+                    written=written)
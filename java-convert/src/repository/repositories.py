@@ -1,6 +1,7 @@
 import os
+from typing import Dict, List
 
-from src.utils import pom_info, util
+from src.utils import events, project_layout, restructure, util, vfs
 
 
 def get_repository_path(source_root: str) -> str:
@@ -11,19 +12,50 @@ def get_repository_path(source_root: str) -> str:
             return path
 
 
-def refactor_or_create_repositories(source_directory: str):
-    source_root = pom_info.get_dir_source_code_path(source_directory)
+def classify_repositories(headers: List[util.JavaHeader]) -> Dict[str, List[util.JavaHeader]]:
+    """
+    Separa os arquivos do pacote de repositórios pelo tipo declarado (interface, class...),
+    em uma única passagem pelos cabeçalhos.
+    """
+    kinds = {}
+    for header in headers:
+        kinds.setdefault(header['type_kind'], []).append(header)
+    return kinds
+
+
+def plan_interface_copies(interfaces: List[util.JavaHeader], source_path: str,
+                          destiny_path: str) -> List[restructure.Operation]:
+    """
+    Planeja a cópia das interfaces para domain/repositories, mantendo os subpacotes.
+    Interfaces que já existem no destino não são copiadas.
+    """
+    operations = []
+    for header in interfaces:
+        relative_path = os.path.relpath(header['path'], os.path.abspath(source_path))
+        destination = os.path.join(destiny_path, relative_path)
+        if vfs.exists(destination):
+            continue
+        operations.append({'action': 'mkdir', 'source': None, 'destination': os.path.dirname(destination)})
+        operations.append({'action': 'copy', 'source': header['path'], 'destination': destination})
+    return operations
+
+
+def refactor_or_create_repositories(source_directory: str, java_files: List[str] = None):
+    """
+    Copia as interfaces de repositório para domain/repositories, todas de uma vez.
+    Basta o cabeçalho de cada arquivo: não é preciso analisar o corpo dos repositórios.
+    """
+    layout = project_layout.get_project_layout(source_directory)
+    source_root = layout['source_root']
     source_path = get_repository_path(source_root)
     destiny_path = os.path.join(source_root, "domain", "repositories")
-    java_files = util.get_java_files(source_path)
-
-    print(source_path)
-
-    for source_file in java_files:
-        package_name, class_name, tree, codelines = util.process_java_file(source_file)
-
-        print(f'É uma interface?{util.is_interface(tree)}')
-        if util.is_interface(tree):
-            file_name = util.get_interface_name(tree)
-            print(f'Nome da interface: {file_name}')
-            util.copy_file(source_path, destiny_path, file_name)
+    if java_files is None:
+        java_files = project_layout.get_java_files(layout, source_path)
+    if source_path is None or not java_files:
+        return
+
+    kinds = classify_repositories(util.load_java_headers(java_files))
+    interfaces = kinds.get('interface', [])
+    copied = restructure.execute(plan_interface_copies(interfaces, source_path, destiny_path))
+    events.emit('summary', f"Repositórios: {len(interfaces)} interfaces, {copied} copiadas para {destiny_path}",
+                count=copied)
@@ -0,0 +1,246 @@
+import functools
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from src.repository import repositories
+from src.usecase import rendering
+from src.utils import events, file_discovery, java_model, output_writer, parallel, profiler, project_layout, \
+    restructure, symbol_index, templates, util, vfs
+
+# Interfaces do Spring Data cujos argumentos de tipo são <entidade, id>
+SPRING_DATA_PATTERN = re.compile(
+    r'\b(?:Jpa|Crud|ListCrud|PagingAndSorting|ListPagingAndSorting)Repository\s*<\s*([\w.]+)\s*,\s*([\w.]+)\s*>'
+)
+
+# Declaração de um método abstrato: tipo de retorno, nome, parâmetros e throws
+METHOD_PATTERN = re.compile(r'^(?P<return_type>.+?)\s+(?P<name>\w+)\s*\((?P<parameters>.*)\)\s*(?P<throws>throws\s+[^;]+)?;$',
+                            re.DOTALL)
+
+MODIFIERS_PATTERN = re.compile(r'^(?:(?:public|abstract)\s+)+')
+
+# Sufixos removidos do nome da entidade para obter o nome da tabela (jOOQ)
+ENTITY_SUFFIXES = ('Entity', 'Model')
+
+# Consulta em lote gerada quando a entidade e o id são conhecidos
+BATCH_METHOD_NAME = 'findAllByIds'
+
+BATCH_IMPORTS = ('java.util.ArrayList', 'java.util.Collection', 'java.util.List')
+
+# Sufixo da classe gerada: <Repo>Impl é o nome de fragmento do Spring Data, que o
+# associaria à própria interface injetada (dependência circular)
+ADAPTER_SUFFIX = 'Adapter'
+
+# Método da interface a ser implementado por delegação
+RepositoryMethod = Dict[str, str]
+
+
+def get_repository_impl_template():
+    return templates.get_template('repository_impl_template.jinja')
+
+
+def split_parameters(parameters: str) -> List[str]:
+    """
+    Separa os parâmetros pelas vírgulas fora de <> (ex.: Map<String, Long> values, int page).
+    """
+    parts = []
+    depth = 0
+    current = []
+    for char in parameters:
+        if char in '<(':
+            depth += 1
+        elif char in '>)':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+def parse_repository_method(method_text: str) -> Optional[RepositoryMethod]:
+    """
+    Obtém, do texto de um método abstrato da interface, a declaração e os argumentos da chamada.
+    """
+    declaration = rendering.ANNOTATION_PATTERN.sub('', rendering.COMMENT_PATTERN.sub('', method_text))
+    declaration = ' '.join(declaration.split())
+    match = METHOD_PATTERN.match(declaration)
+    if match is None:
+        return None
+
+    parameters = [rendering.ANNOTATION_PATTERN.sub('', parameter).strip()
+                  for parameter in split_parameters(match['parameters'])]
+    arguments = [parameter.replace('...', ' ').split()[-1] for parameter in parameters]
+    return_type = MODIFIERS_PATTERN.sub('', match['return_type']).strip()
+    return {
+        'name': match['name'],
+        'return_type': return_type,
+        'parameters': ', '.join(' '.join(parameter.split()) for parameter in parameters),
+        'arguments': ', '.join(arguments),
+        'throws': match['throws'] or '',
+        'returns': return_type != 'void',
+    }
+
+
+def get_table_name(entity_type: str) -> str:
+    """
+    Obtém o nome da tabela a partir da entidade (ProductOrderEntity -> product_order).
+    """
+    name = entity_type.rsplit('.', 1)[-1]
+    for suffix in ENTITY_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            name = name[:-len(suffix)]
+            break
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+def render_repository_impl(item: Tuple[str, str, java_model.FileRecord], domain_path: str, destination_path: str,
+                           acitive_lombook: bool, jooq: bool) -> Optional[Tuple[str, str]]:
+    """
+    Renderiza o adaptador do repositório em infra/repositories: os métodos declarados
+    na interface de domain/repositories são delegados a ela e, quando a entidade e o id
+    são conhecidos, é gerada a consulta em lote findAllByIds (com o jOOQ, em uma única
+    consulta com IN).
+    item é (arquivo analisado, arquivo em domain/repositories, modelo). Retorna
+    (arquivo de destino, código renderizado), ou None se o arquivo não declara uma interface.
+    """
+    source_file, domain_file, model = item
+    if not model.interfaces:
+        return None
+    repository_name = model.interfaces[0]
+
+    # Métodos da interface: os que não pertencem a nenhuma classe do arquivo
+    class_methods = {position for class_info in model.classes for position in class_info.methods}
+    methods = []
+    for position, method in enumerate(model.methods):
+        if position in class_methods or 'default' in method.modifiers or 'static' in method.modifiers:
+            continue
+        repository_method = parse_repository_method(java_model.get_method_text(model, method).strip())
+        if repository_method is not None:
+            methods.append(repository_method)
+
+    entity_type = None
+    id_type = None
+    match = SPRING_DATA_PATTERN.search(rendering.COMMENT_PATTERN.sub('', model.code))
+    if match is not None:
+        entity_type, id_type = match.group(1), match.group(2)
+
+    # Subpacotes abaixo de domain/repositories são mantidos no destino
+    relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(domain_file)), os.path.abspath(domain_path))
+    destination_dir = os.path.normpath(os.path.join(destination_path, relative_dir))
+    package_name = model.package_name or ''
+    domain_package = restructure.get_moved_package(package_name, os.path.dirname(source_file),
+                                                   os.path.dirname(domain_file)) or package_name
+    adapter_package = restructure.get_moved_package(package_name, os.path.dirname(source_file),
+                                                    destination_dir) or package_name
+    adapter_name = f"{repository_name}{ADAPTER_SUFFIX}"
+
+    # Imports da interface usados pelo código gerado
+    generated_text = ' '.join([entity_type or '', id_type or ''] + [
+        f"{method['return_type']} {method['parameters']} {method['throws']}" for method in methods
+    ])
+    used_names = rendering.get_used_names(generated_text)
+    batch = entity_type is not None and all(method['name'] != BATCH_METHOD_NAME for method in methods)
+    imports = ['org.springframework.stereotype.Repository',
+               f"{domain_package}.{repository_name}" if domain_package else repository_name]
+    if acitive_lombook:
+        imports.append('lombok.RequiredArgsConstructor')
+    if jooq:
+        imports.extend(['org.jooq.DSLContext', 'org.jooq.impl.DSL'])
+    if batch:
+        imports.extend(import_path for import_path in BATCH_IMPORTS if not jooq or import_path != 'java.util.ArrayList')
+    for record in model.imports:
+        imported_type = java_model.get_imported_type(record)
+        import_text = java_model.format_import(record)
+        if (imported_type is None or imported_type in used_names) and import_text not in imports:
+            imports.append(import_text)
+
+    profiler.count('templates_rendered')
+    with profiler.span('jinja.render', 'render'):
+        rendered_template = get_repository_impl_template().render(
+            package_name=adapter_package,
+            adapter_name=adapter_name,
+            repository_name=repository_name,
+            repository_field=repository_name[0].lower() + repository_name[1:],
+            imports=imports,
+            methods=methods,
+            batch=batch,
+            batch_method_name=BATCH_METHOD_NAME,
+            entity_type=entity_type,
+            id_type=id_type,
+            table_name=get_table_name(entity_type) if entity_type else None,
+            jooq=jooq,
+            acitive_lombook=acitive_lombook,
+        )
+    return os.path.join(destination_dir, f"{adapter_name}.java"), rendered_template
+
+
+def get_interface_files(java_files: List[str], source_path: Optional[str], domain_path: str) -> Dict[str, str]:
+    """
+    Obtém, para cada arquivo, o arquivo a analisar e o arquivo correspondente em domain/repositories.
+    Os arquivos de repository/ são substituídos pelas cópias em domain/repositories. No modo plan,
+    uma cópia que existe apenas no plano é analisada pela interface original: os tipos dela são
+    atualizados depois, no plano, pela etapa de referências.
+    """
+    files = {}
+    for java_file in java_files:
+        java_file = os.path.abspath(java_file)
+        relative_file = os.path.relpath(java_file, source_path) if source_path is not None else os.pardir
+        if relative_file.startswith(os.pardir):
+            relative_file = os.path.relpath(java_file, domain_path)
+        domain_file = os.path.abspath(os.path.join(domain_path, relative_file))
+        original_file = os.path.join(source_path, relative_file) if source_path is not None else domain_file
+        parsed_file = domain_file if os.path.isfile(domain_file) else original_file
+        if vfs.exists(domain_file) and os.path.isfile(parsed_file):
+            files[parsed_file] = domain_file
+    return files
+
+
+def refactor_repository_impl(source_directory: str, java_files: List[str] = None):
+    """
+    Cria os adaptadores dos repositórios em infra/repositories, a partir das interfaces já
+    copiadas para domain/repositories (com os tipos e pacotes do domínio).
+    Os arquivos são renderizados em paralelo e gravados à medida que ficam prontos.
+    Quando java_files é informado, apenas esses arquivos (ou suas cópias em domain/repositories)
+    são processados.
+    """
+    layout = project_layout.get_project_layout(source_directory)
+    source_root = layout['source_root']
+    source_path = repositories.get_repository_path(source_root)
+    domain_path = os.path.join(source_root, "domain", "repositories")
+    if not vfs.exists(domain_path):
+        return
+    if java_files is None:
+        java_files = list(file_discovery.iter_files(domain_path, ignore_root=source_directory))
+    domain_files = get_interface_files(java_files, source_path, domain_path)
+
+    # Apenas as interfaces, classificadas pelo cabeçalho, são analisadas por completo
+    interfaces = repositories.classify_repositories(util.load_java_headers(list(domain_files))).get('interface', [])
+    units = util.load_java_units([header['path'] for header in interfaces])
+    jooq = layout['pom']['features']['jooq']
+    render = functools.partial(
+        render_repository_impl,
+        domain_path=domain_path,
+        destination_path=os.path.join(source_root, "infra", "repositories"),
+        acitive_lombook=layout['lombok'],
+        jooq=jooq,
+    )
+
+    written = 0
+    items = [(unit['path'], domain_files[unit['path']], util.get_java_model(unit)) for unit in units]
+    for (source_file, domain_file, _), result in zip(items, parallel.imap_files(render, items)):
+        if result is None:
+            continue
+        destination_file, rendered_template = result
+        if output_writer.write_file(destination_file, rendered_template) == output_writer.WRITTEN:
+            written += 1
+        # O adaptador é registrado para a interface de repository/, quando ela existe, que é o
+        # arquivo acompanhado pelo modo incremental e pelo watch
+        original_file = os.path.join(source_path, os.path.relpath(domain_file, domain_path)) if source_path else None
+        symbol_index.record_output(destination_file, original_file if original_file and vfs.exists(original_file)
+                                   else source_file, 'refactor_repository_impl')
+
+    events.emit('summary', f"Repositórios: {written} adaptadores gerados{' (jOOQ)' if jooq else ''}", count=written)
@@ -1,15 +1,66 @@
 import os
 
-from src.utils import pom_info,util
+from src.utils import events, project_layout, restructure, vfs
+
+ENTITY_DIRS = ['model', 'models']
+
+
+def get_entity_file_name(file_name: str) -> str:
+    """
+    Nome do arquivo da entidade: remove o sufixo Model e adiciona o sufixo Entity.
+    ProductModel.java -> ProductEntity.java
+    """
+    if 'Model' in file_name and not file_name.startswith('Model'):
+        file_name = file_name.replace('Model', '')
+    if not file_name.endswith('Entity.java'):
+        file_name = f"{os.path.splitext(file_name)[0]}Entity.java"
+    return file_name
 
 
 def refactor_domain(source_directory: str):
-    source_root = pom_info.get_dir_source_code_path(source_directory)
-    util.copy_dirs(source_root, 'domain', ['enums', 'model', 'models', 'exceptions', 'value_objects'])
+    """
+    Copia os pacotes do domínio para domain e leva model (ou models) para domain/entities.
+    Todas as cópias e renomeações são planejadas antes e executadas de uma vez; as entidades
+    são gravadas já com o novo nome, pacote e classe.
+    """
+    layout = project_layout.get_project_layout(source_directory)
+    source_root = layout['source_root']
+    domain_path = os.path.join(source_root, 'domain')
+    entities_path = os.path.join(domain_path, 'entities')
+
+    # Diretório que vira domain/entities: o primeiro de model/models que existe no domínio ou na origem
+    entity_dir = None
+    if not vfs.exists(entities_path):
+        for dir_name in ENTITY_DIRS:
+            if vfs.exists(os.path.join(domain_path, dir_name)) or vfs.exists(os.path.join(source_root, dir_name)):
+                entity_dir = dir_name
+                break
 
-    util.remane_dirs(os.path.join(source_root, 'domain'), 'entities', ["model", "models"])
+    operations = []
+    for dir_name in ['enums', 'model', 'models', 'exceptions', 'value_objects']:
+        source_path = os.path.join(source_root, dir_name)
+        destination_path = os.path.join(domain_path, dir_name)
+        if dir_name in ENTITY_DIRS and dir_name != entity_dir and vfs.exists(entities_path):
+            # As entidades já foram geradas: model não é copiado de novo para domain/model
+            continue
+        if dir_name == entity_dir:
+            if vfs.exists(destination_path):
+                events.emit('renamed', f'Diretório renomeado: domain/{dir_name} para entities', 'debug',
+                            source=destination_path, destination=entities_path)
+                operations.extend(restructure.plan_tree(destination_path, entities_path, 'rename',
+                                                        get_entity_file_name))
+            else:
+                # A origem é copiada (ou movida, no modo move) para domain/entities
+                event = 'moved' if restructure.get_settings()['mode'] == 'move' else 'copied'
+                events.emit(event, f'Diretório {restructure.EVENT_LABELS[event].lower()}: {dir_name} para entities',
+                            'debug', source=source_path, destination=entities_path)
+                operations.extend(restructure.plan_tree(source_path, entities_path, 'copy', get_entity_file_name))
+        elif vfs.exists(source_path) and not vfs.exists(destination_path):
+            operations.extend(restructure.plan_tree(source_path, destination_path))
 
-    entities_dir = os.path.join(source_root, 'domain', 'entities')
+    if entity_dir is None and vfs.exists(entities_path):
+        operations.extend(restructure.plan_tree(entities_path, entities_path, 'rename', get_entity_file_name))
 
-    util.remove_suffix_in_java_files(entities_dir, 'Model')
-    util.add_suffix_in_java_files(entities_dir, 'Entity')
+    count = restructure.execute(operations)
+    events.emit('summary', f"Domínio: {count} arquivos reestruturados (modo {restructure.get_settings()['mode']})",
+                count=count)
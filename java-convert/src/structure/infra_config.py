@@ -1,6 +1,7 @@
-from src.utils import pom_info,util
+from src.utils import project_layout, restructure
 
 
 def refactor_infrastructure(source_directory: str):
-    source_root = pom_info.get_dir_source_code_path(source_directory)
-    util.copy_dirs(source_root, 'infra', ['config', 'security', 'jooq'])
+    layout = project_layout.get_project_layout(source_directory)
+    source_root = layout['source_root']
+    restructure.execute(restructure.plan_copy_dirs(source_root, 'infra', ['config', 'security', 'jooq']))
@@ -0,0 +1,192 @@
+import functools
+import os
+from typing import Dict, Optional
+
+from src.utils import events, file_discovery, lazy, output_writer, parallel, project_layout, restructure, util, vfs
+
+javalang = lazy.lazy_import('javalang')
+
+# Tabela de símbolos das renomeações: nome qualificado antigo -> novo, nomes simples e pacotes
+SymbolTable = Dict[str, Dict[str, str]]
+
+
+def get_package(qualified_name: str) -> str:
+    return qualified_name.rsplit('.', 1)[0]
+
+
+def get_simple_name(qualified_name: str) -> str:
+    return qualified_name.rsplit('.', 1)[-1]
+
+
+def build_symbol_table(renames: Dict[str, str]) -> SymbolTable:
+    """
+    Monta a tabela usada na reescrita. Um pacote só é mapeado (para os imports com *)
+    quando todos os tipos renomeados dele foram para o mesmo pacote novo.
+    """
+    packages = {}
+    for old_name, new_name in renames.items():
+        packages.setdefault(get_package(old_name), set()).add(get_package(new_name))
+
+    return {
+        'types': dict(renames),
+        'previous': {new_name: old_name for old_name, new_name in renames.items()},
+        'packages': {old: next(iter(new)) for old, new in packages.items() if len(new) == 1},
+        # Textos que indicam que o arquivo pode referenciar um tipo renomeado
+        'markers': sorted({get_simple_name(old_name) for old_name in renames} | set(packages)),
+    }
+
+
+def read_qualified_run(tokens, index):
+    """
+    Lê a sequência Identificador(.Identificador)* a partir do token informado.
+    Retorna a posição do último token da sequência.
+    """
+    last = index
+    while (last + 2 < len(tokens) and tokens[last + 1].value == '.'
+           and isinstance(tokens[last + 2], javalang.tokenizer.Identifier)):
+        last += 2
+    return last
+
+
+def get_visible_names(tokens, table: SymbolTable, package_name: Optional[str]) -> Dict[str, str]:
+    """
+    Obtém os nomes simples antigos visíveis no arquivo e seus novos nomes: tipos importados
+    explicitamente, por import com *, ou do mesmo pacote quando foram para o mesmo pacote novo.
+    """
+    imported = set()
+    wildcard_packages = set()
+    index = 0
+    while index < len(tokens):
+        if tokens[index].value == 'import':
+            start = index + 1
+            if tokens[start].value == 'static':
+                start += 1
+            last = read_qualified_run(tokens, start)
+            path = ''.join(token.value for token in tokens[start:last + 1])
+            if last + 2 < len(tokens) and tokens[last + 1].value == '.' and tokens[last + 2].value == '*':
+                wildcard_packages.add(path)
+            else:
+                imported.add(path)
+            index = last
+        elif isinstance(tokens[index], javalang.tokenizer.Keyword) and tokens[index].value in ('class', 'interface', 'enum'):
+            break
+        index += 1
+
+    visible = {}
+    for old_name, new_name in table['types'].items():
+        old_package = get_package(old_name)
+        if (old_name in imported or old_package in wildcard_packages
+                or (old_package == package_name and get_package(new_name) == table['packages'].get(old_package))):
+            visible[get_simple_name(old_name)] = get_simple_name(new_name)
+    return visible
+
+
+def rewrite_references(code: str, table: SymbolTable, type_name: Optional[str] = None) -> Optional[str]:
+    """
+    Reescreve, em uma única passagem pelos tokens, os imports e as referências aos tipos renomeados.
+    A declaração package não é alterada. Retorna None quando o arquivo não muda.
+    type_name é o tipo declarado no arquivo: se ele foi realocado, vale o pacote antigo
+    para as referências sem import.
+    """
+    if not any(marker in code for marker in table['markers']):
+        return None
+
+    try:
+        tokens = list(javalang.tokenizer.tokenize(code))
+    except javalang.tokenizer.LexerError:
+        return None
+
+    package_name = None
+    if tokens and tokens[0].value == 'package':
+        package_name = ''.join(token.value for token in tokens[1:read_qualified_run(tokens, 1) + 1])
+        # Original de um tipo copiado (modo copy): continua válido com os nomes antigos
+        if f'{package_name}.{type_name}' in table['types']:
+            return None
+        old_name = table['previous'].get(f'{package_name}.{type_name}')
+        if old_name is not None:
+            package_name = get_package(old_name)
+    visible = get_visible_names(tokens, table, package_name)
+
+    edits = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token.value == 'package' and isinstance(token, javalang.tokenizer.Keyword):
+            index = read_qualified_run(tokens, index + 1) + 1
+            continue
+        if not isinstance(token, javalang.tokenizer.Identifier):
+            index += 1
+            continue
+
+        last = read_qualified_run(tokens, index)
+        names = [tokens[position].value for position in range(index, last + 1, 2)]
+        replaced = False
+        # Nome qualificado: o maior prefixo que é um tipo (ou, em import com *, um pacote) renomeado
+        for length in range(len(names), 1, -1):
+            prefix = '.'.join(names[:length])
+            new_name = table['types'].get(prefix)
+            is_wildcard = (length == len(names) and last + 2 < len(tokens) and tokens[last + 2].value == '*'
+                           and tokens[last + 1].value == '.')
+            if new_name is None and is_wildcard:
+                new_name = table['packages'].get(prefix)
+            if new_name is not None:
+                edits.append((tokens[index], tokens[index + 2 * (length - 1)], new_name))
+                replaced = True
+                break
+
+        if not replaced and names[0] in visible and (index == 0 or tokens[index - 1].value != '.'):
+            edits.append((token, token, visible[names[0]]))
+        index = last + 1
+
+    if not edits:
+        return None
+
+    line_offsets = util.get_line_offsets(code)
+
+    def get_offset(edit_token):
+        return line_offsets[edit_token.position.line - 1] + edit_token.position.column - 1
+
+    parts = []
+    position = 0
+    for first, last_token, text in edits:
+        parts.append(code[position:get_offset(first)])
+        parts.append(text)
+        position = get_offset(last_token) + len(last_token.value)
+    parts.append(code[position:])
+    return ''.join(parts)
+
+
+def rewrite_file(source_file: str, table: SymbolTable) -> Optional[str]:
+    """
+    Reescreve um arquivo. Pode ser executada em um processo filho.
+    """
+    type_name = os.path.splitext(os.path.basename(source_file))[0]
+    return rewrite_references(vfs.read_text(source_file), table, type_name)
+
+
+def refactor_references(source_directory: str):
+    """
+    Atualiza, em todos os arquivos .java do projeto, os imports e as referências aos tipos
+    renomeados ou movidos pelas etapas de reestruturação. Os arquivos são processados em paralelo.
+    """
+    renames = restructure.get_project_renames()
+    if not renames:
+        return
+
+    layout = project_layout.get_project_layout(source_directory)
+    java_files = list(file_discovery.iter_files(layout['source_root'], ignore_root=source_directory))
+    rewrite = functools.partial(rewrite_file, table=build_symbol_table(renames))
+
+    # No modo de planejamento os arquivos realocados existem apenas em memória, neste processo
+    if vfs.is_plan_mode():
+        results = [rewrite(source_file) for source_file in java_files]
+    else:
+        results = parallel.map_files(rewrite, java_files)
+
+    for source_file, code in zip(java_files, results):
+        if code is not None:
+            output_writer.add_file(source_file, code)
+
+    written = [path for path, status in output_writer.flush() if status == output_writer.WRITTEN]
+    events.emit('summary', f"Referências atualizadas em {len(written)} arquivos ({len(renames)} tipos renomeados)",
+                count=len(written))
@@ -0,0 +1,107 @@
+import os
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.utils import java_model
+
+# Agrupamento dos casos de uso gerados: um arquivo por método público ('method')
+# ou um contrato e uma implementação por serviço ('class')
+GROUPINGS = ('method', 'class')
+
+IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_$][\w$]*')
+
+# Anotação com argumentos opcionais (um nível de parênteses aninhados), ex.: @RequestMapping(value = "/x")
+ANNOTATION_PATTERN = re.compile(r'@[\w.]+(?:\s*\((?:[^()]|\([^()]*\))*\))?')
+
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/|//[^\n]*', re.DOTALL)
+
+_settings = {'grouping': 'method'}
+
+# Contexto de renderização de uma classe de serviço, calculado uma única vez para todos os métodos
+ClassContext = Dict[str, object]
+
+# Grupo de métodos renderizados em um arquivo: (nome do caso de uso, métodos)
+MethodGroup = Tuple[str, List[java_model.MethodRecord]]
+
+
+def configure_rendering(grouping: str = 'method'):
+    if grouping not in GROUPINGS:
+        raise ValueError(f"Agrupamento inválido: {grouping}")
+    _settings['grouping'] = grouping
+
+
+def get_settings() -> Dict[str, str]:
+    return dict(_settings)
+
+
+def get_used_names(text: str) -> Set[str]:
+    return set(IDENTIFIER_PATTERN.findall(text))
+
+
+def build_class_context(model: java_model.FileRecord, class_info: java_model.ClassRecord,
+                        destination_path: str) -> ClassContext:
+    """
+    Monta o contexto de renderização da classe: campos, dependências, pasta de destino
+    e os imports indexados pelo nome simples, para a seleção por método.
+    """
+    new_class_name = model.class_name.replace('Service', '')
+    imports_by_name = {}
+    kept_imports = []
+    for record in model.imports:
+        imported_type = java_model.get_imported_type(record)
+        if imported_type is not None:
+            imports_by_name.setdefault(imported_type, []).append(record)
+        else:
+            kept_imports.append(record)
+
+    return {
+        'package_name': model.package_name,
+        'new_class_name': new_class_name,
+        'folder_name': new_class_name.lower(),
+        'service_folder': os.path.join(destination_path, new_class_name.lower()),
+        'fields': [java_model.format_field(field) for field in class_info.fields],
+        'dependencies': class_info.fields,
+        'field_names': get_used_names(' '.join(field.type for field in class_info.fields)),
+        'imports': model.imports,
+        'imports_by_name': imports_by_name,
+        'kept_imports': kept_imports,
+    }
+
+
+def select_imports(context: ClassContext, texts: Iterable[str], include_fields: bool = False) -> List[str]:
+    """
+    Seleciona, na ordem original, os imports dos tipos usados nos textos informados
+    (e nos tipos dos campos, com include_fields), já no formato dos templates.
+    """
+    used_names = set(context['field_names']) if include_fields else set()
+    for text in texts:
+        used_names.update(get_used_names(text))
+
+    selected = set(context['kept_imports'])
+    for name in used_names.intersection(context['imports_by_name']):
+        selected.update(context['imports_by_name'][name])
+    return [java_model.format_import(record) for record in context['imports'] if record in selected]
+
+
+def get_public_methods(model: java_model.FileRecord, class_info: java_model.ClassRecord) -> List[java_model.MethodRecord]:
+    """
+    Obtém os métodos da classe que geram casos de uso: apenas os públicos (não estáticos).
+    """
+    return [method for method in java_model.get_class_methods(model, class_info) if method.modifiers == ('public',)]
+
+
+def get_method_groups(model: java_model.FileRecord, class_info: java_model.ClassRecord,
+                      context: ClassContext, suffix: str, grouping: str = 'method') -> List[MethodGroup]:
+    """
+    Agrupa os métodos públicos da classe de acordo com o agrupamento ('method' ou 'class').
+    """
+    methods = get_public_methods(model, class_info)
+    if grouping == 'class':
+        if not methods:
+            return []
+        return [(f"{context['new_class_name']}{suffix}", methods)]
+
+    return [
+        (f"{method.name[0].upper() + method.name[1:]}{context['new_class_name']}{suffix}", [method])
+        for method in methods
+    ]
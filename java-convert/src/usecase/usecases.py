@@ -1,23 +1,16 @@
+import functools
 import os
+from typing import List, Optional, Tuple
 
-import javalang
-from jinja2 import Template
-
-from src.utils import pom_info,util
+from src.usecase import rendering
+from src.utils import project_layout, util, parallel, templates, output_writer, profiler, symbol_index, events
 
 
 def get_use_case_template():
-    templates_dir = util.get_templates_dir()
-    template_path = os.path.join(templates_dir, 'use_case_template.jinja')
-
-    with open(template_path, 'r') as file:
-        template_content = file.read()
+    return templates.get_template('use_case_template.jinja')
 
-    return Template(template_content)
 
-
-def create_use_case_file(
-        destination_file,
+def render_use_case(
         template,
         package_name,
         use_case_name,
@@ -28,73 +21,70 @@ def create_use_case_file(
         class_name
 ):
     """
-    Cria o arquivo .java para o caso de uso com base no modelo e informações fornecidas.
+    Renderiza o código do caso de uso com base no modelo e informações fornecidas.
     """
-    rendered_template = template.render(
-        package_name=package_name,
-        use_case_name=use_case_name,
-        fields=fields,
-        method_code=method_code,
-        dependencies=dependencies,
-        imports=imports,
-        class_name=class_name
-    )
-
-    with open(destination_file, 'w') as f:
-        f.write(rendered_template)
-
-
-def create_use_case_file_if_not_exists(
-        destination_file, template, package_name, use_case_name, fields,
-        method_code,
-        dependencies,
-        imports, class_name
-):
+    profiler.count('templates_rendered')
+    with profiler.span('jinja.render', 'render'):
+        return template.render(
+            package_name=package_name,
+            use_case_name=use_case_name,
+            fields=fields,
+            method_code=method_code,
+            dependencies=dependencies,
+            imports=imports,
+            class_name=class_name
+        )
+
+
+def render_use_cases(model, destination_path, grouping='method') -> List[Tuple[str, Optional[str], str]]:
     """
-    Cria o arquivo do caso de uso se não existir.
+    Renderiza os casos de uso dos métodos públicos de um arquivo de serviço.
+    O contexto da classe é montado uma única vez, e cada arquivo recebe apenas os imports que usa.
+    Retorna uma lista de (arquivo de destino, chave do método ou None no agrupamento por classe, código renderizado).
     """
-    if not os.path.exists(destination_file):
-        create_use_case_file(
-            destination_file, template, package_name, use_case_name, fields, method_code, dependencies, imports,
-            class_name
-        )
-        print(f"Created {use_case_name}.java in {os.path.dirname(destination_file)}")
-    else:
-        print(f"File {use_case_name}.java already exists in {os.path.dirname(destination_file)}")
+    template = get_use_case_template()
+    use_cases = []
+
+    for class_info in model.classes:
+        context = rendering.build_class_context(model, class_info, destination_path)
+
+        for use_case_name, methods in rendering.get_method_groups(model, class_info, context, 'UseCase', grouping):
+            destination_file = os.path.join(context['service_folder'], use_case_name + ".java")
+            signatures = [method.signature for method in methods]
+
+            rendered_template = render_use_case(
+                template, context['package_name'], use_case_name, context['fields'], "\n\n".join(signatures),
+                context['dependencies'], rendering.select_imports(context, signatures), context['folder_name']
+            )
+            method_key = methods[0].key if grouping == 'method' else None
+            use_cases.append((destination_file, method_key, rendered_template))
+
+    return use_cases
 
 
-def refactor_use_cases(source_directory: str):
+def refactor_use_cases(source_directory: str, java_files: List[str] = None):
     """
     Cria os casos de uso com base nos arquivos .java no diretório de origem.
+    Quando java_files é informado, apenas esses arquivos são processados.
     """
-    source_root = pom_info.get_dir_source_code_path(source_directory)
+    layout = project_layout.get_project_layout(source_directory)
+    source_root = layout['source_root']
     source_path = os.path.join(source_root, "services")
     destination_path = os.path.join(source_root, "data", "contracts")
-    java_files = util.get_java_files(source_path)
-
-    for source_file in java_files:
-        package_name, class_name, tree, codelines = util.process_java_file(source_file)
-        imports = util.extract_imports(tree)
-
-        for path, node in tree.filter(javalang.tree.ClassDeclaration):
-            fields = util.extract_fields(node)
-            dependencies = util.extract_dependencies(node)
-
-            for method in node.methods:
-                if method.modifiers == {'public'}:
-                    method_name = method.name
-                    new_class_name = class_name.replace('Service', '')
-
-                    use_case_name = f"{method_name[0].upper() + method_name[1:]}{new_class_name}UseCase"
-                    service_folder = os.path.join(destination_path, new_class_name.lower())
-                    if not os.path.exists(service_folder):
-                        os.makedirs(service_folder)
-                    destination_file = os.path.join(service_folder, use_case_name + ".java")
-
-                    template = get_use_case_template()
-                    method_code = util.get_method_signature(method_name, tree, codelines)
-
-                    create_use_case_file_if_not_exists(
-                        destination_file, template, package_name, use_case_name, fields, method_code, dependencies,
-                        imports, new_class_name.lower()
-                    )
+    if java_files is None:
+        java_files = project_layout.get_java_files(layout, source_path)
+
+    units = util.load_java_units(java_files)
+    models = [util.get_java_model(unit) for unit in units]
+    render = functools.partial(render_use_cases, destination_path=destination_path,
+                               grouping=rendering.get_settings()['grouping'])
+
+    # A renderização é feita em paralelo; a gravação dos arquivos fica no processo principal
+    for unit, use_cases in zip(units, parallel.map_files(render, models)):
+        for destination_file, method_key, rendered_template in use_cases:
+            # Casos de uso existentes nunca são sobrescritos
+            output_writer.add_file(destination_file, rendered_template, overwrite=False)
+            symbol_index.record_output(destination_file, unit['path'], 'refactor_use_cases', method_key)
+
+    written = sum(status == output_writer.WRITTEN for _, status in output_writer.flush())
+    events.emit('summary', f"Casos de uso: {written} gerados em {destination_path}", count=written)
@@ -1,23 +1,17 @@
+import functools
 import os
+from typing import List, Optional, Tuple
 
-import javalang
-from jinja2 import Template
-
-from src.utils import pom_info, util
+from src.usecase import rendering
+from src.utils import project_layout, util, parallel, templates, output_writer, profiler, symbol_index, java_model, \
+    events
 
 
 def get_use_case_template():
-    templates_dir = util.get_templates_dir()
-    template_path = os.path.join(templates_dir, 'use_case_impl_template.jinja')
-
-    with open(template_path, 'r') as file:
-        template_content = file.read()
+    return templates.get_template('use_case_impl_template.jinja')
 
-    return Template(template_content)
 
-
-def create_use_case_impl_file(
-        destination_file,
+def render_use_case_impl(
         template,
         package_name,
         use_case_name,
@@ -29,60 +23,76 @@ def create_use_case_impl_file(
         acitive_lombook
 ):
     """
-    Cria o arquivo .java para o caso de uso com base no modelo e informações fornecidas.
+    Renderiza o código da implementação do caso de uso com base no modelo e informações fornecidas.
     """
-    rendered_template = template.render(
-        package_name=package_name,
-        use_case_name=use_case_name,
-        fields=fields,
-        method_code=method_code,
-        dependencies=dependencies,
-        imports=imports,
-        class_name=class_name,
-        acitive_lombook=acitive_lombook
-    )
-
-    with open(destination_file, 'w') as f:
-        f.write(rendered_template)
-
-
-def refactor_use_cases_impl(source_directory):
+    profiler.count('templates_rendered')
+    with profiler.span('jinja.render', 'render'):
+        return template.render(
+            package_name=package_name,
+            use_case_name=use_case_name,
+            fields=fields,
+            method_code=method_code,
+            dependencies=dependencies,
+            imports=imports,
+            class_name=class_name,
+            acitive_lombook=acitive_lombook
+        )
+
+
+def render_use_cases_impl(model, destination_path, acitive_lombook,
+                          grouping='method') -> List[Tuple[str, Optional[str], str]]:
     """
-    Cria os casos de uso com base nos arquivos .java no diretório de origem.
+    Renderiza as implementações dos casos de uso dos métodos públicos de um arquivo de serviço.
+    O contexto da classe é montado uma única vez, e cada arquivo recebe apenas os imports que usa.
+    Retorna uma lista de (arquivo de destino, chave do método ou None no agrupamento por classe, código renderizado).
     """
+    template = get_use_case_template()
+    use_cases = []
 
-    source_root = pom_info.get_dir_source_code_path(source_directory)
-    source_path = os.path.join(source_root, "services")
-    destination_path = os.path.join(source_root, "data", "usecases")
-    java_files = util.get_java_files(source_path)
+    for class_info in model.classes:
+        context = rendering.build_class_context(model, class_info, destination_path)
+
+        for use_case_name, methods in rendering.get_method_groups(model, class_info, context, 'UseCaseImpl', grouping):
+            destination_file = os.path.join(context['service_folder'], use_case_name + ".java")
+            method_texts = [java_model.get_method_text(model, method) for method in methods]
 
-    acitive_lombook = pom_info.active_lombok(source_directory)
-    print(f'Lombok ativado: {acitive_lombook}')
+            rendered_template = render_use_case_impl(
+                template, context['package_name'], use_case_name, context['fields'], "\n\n".join(method_texts),
+                context['dependencies'], rendering.select_imports(context, method_texts, include_fields=True),
+                context['folder_name'], acitive_lombook
+            )
+            method_key = methods[0].key if grouping == 'method' else None
+            use_cases.append((destination_file, method_key, rendered_template))
 
-    for source_file in java_files:
-        package_name, class_name, tree, codelines = util.process_java_file(source_file)
+    return use_cases
 
-        imports = util.extract_imports(tree)
 
-        for path, node in tree.filter(javalang.tree.ClassDeclaration):
-            fields = util.extract_fields(node)
-            dependencies = util.extract_dependencies(node)
+def refactor_use_cases_impl(source_directory: str, java_files: List[str] = None):
+    """
+    Cria os casos de uso com base nos arquivos .java no diretório de origem.
+    Quando java_files é informado, apenas esses arquivos são processados.
+    """
+
+    layout = project_layout.get_project_layout(source_directory)
+    source_root = layout['source_root']
+    source_path = os.path.join(source_root, "services")
+    destination_path = os.path.join(source_root, "data", "usecases")
+    if java_files is None:
+        java_files = project_layout.get_java_files(layout, source_path)
 
-            for method in node.methods:
-                if method.modifiers == {'public'}:
-                    method_name = method.name
-                    new_class_name = class_name.replace('Service', '')
+    acitive_lombook = layout['lombok']
+    events.emit('lombok', f'Lombok ativado: {acitive_lombook}', 'debug', enabled=acitive_lombook)
 
-                    use_case_name = f"{method_name[0].upper() + method_name[1:]}{new_class_name}UseCaseImpl"
-                    service_folder = os.path.join(destination_path, new_class_name.lower())
-                    if not os.path.exists(service_folder):
-                        os.makedirs(service_folder)
-                    destination_file = os.path.join(service_folder, use_case_name + ".java")
+    units = util.load_java_units(java_files)
+    models = [util.get_java_model(unit) for unit in units]
+    render = functools.partial(render_use_cases_impl, destination_path=destination_path,
+                               acitive_lombook=acitive_lombook, grouping=rendering.get_settings()['grouping'])
 
-                    template = get_use_case_template()
-                    method_code = util.get_method(method_name, tree, codelines)
+    # A renderização é feita em paralelo; a gravação dos arquivos fica no processo principal
+    for unit, use_cases in zip(units, parallel.map_files(render, models)):
+        for destination_file, method_key, rendered_template in use_cases:
+            output_writer.add_file(destination_file, rendered_template)
+            symbol_index.record_output(destination_file, unit['path'], 'refactor_impl', method_key)
 
-                    create_use_case_impl_file(
-                        destination_file, template, package_name, use_case_name, fields, method_code, dependencies,
-                        imports, new_class_name.lower(), acitive_lombook
-                    )
+    written = sum(status == output_writer.WRITTEN for _, status in output_writer.flush())
+    events.emit('summary', f"Implementações dos casos de uso: {written} geradas em {destination_path}", count=written)
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+from typing import Dict, Optional
+
+# Versão do formato e da extração dos modelos (ex.: a posição dos métodos, que inclui
+# Javadoc e anotações); alterar qualquer um deles invalida todo o cache em disco
+TOOL_VERSION = '4'
+
+CACHE_DIR_NAME = '.java-convert-cache'
+
+_cache_dir: Optional[str] = None
+
+# Somente leitura: consulta o cache, mas não grava nada em disco (--plan)
+_read_only = False
+
+_stats = {'hits': 0, 'misses': 0}
+
+
+def enable_cache(project_source_path: str, read_only: bool = False):
+    """
+    Ativa o cache em disco dentro do diretório do projeto.
+    """
+    global _cache_dir, _read_only
+    _cache_dir = os.path.join(project_source_path, CACHE_DIR_NAME, TOOL_VERSION)
+    _read_only = read_only
+    if not read_only:
+        os.makedirs(_cache_dir, exist_ok=True)
+
+
+def disable_cache():
+    global _cache_dir
+    _cache_dir = None
+
+
+def is_enabled() -> bool:
+    return _cache_dir is not None
+
+
+def is_read_only() -> bool:
+    return _read_only
+
+
+def get_cache_dir() -> Optional[str]:
+    return _cache_dir
+
+
+def set_cache_dir(cache_dir: Optional[str]):
+    global _cache_dir
+    _cache_dir = cache_dir
+
+
+def get_templates_cache_dir() -> Optional[str]:
+    """
+    Obtém o diretório do cache de templates compilados.
+    """
+    if _cache_dir is None or _read_only:
+        return None
+
+    templates_cache_dir = os.path.join(_cache_dir, 'templates')
+    os.makedirs(templates_cache_dir, exist_ok=True)
+    return templates_cache_dir
+
+
+def get_cache_file(content_hash: str) -> str:
+    return os.path.join(_cache_dir, content_hash[:2], f'{content_hash}.json')
+
+
+def load_model(content_hash: str) -> Optional[Dict]:
+    """
+    Obtém o modelo extraído de um arquivo pelo hash do conteúdo, se estiver no cache.
+    """
+    if _cache_dir is None:
+        return None
+
+    try:
+        with open(get_cache_file(content_hash), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def record_lookup(hit: bool):
+    """
+    Contabiliza uma consulta ao cache (feita no processo principal ou em um processo filho).
+    """
+    _stats['hits' if hit else 'misses'] += 1
+
+
+def store_model(content_hash: str, model: Dict):
+    """
+    Grava o modelo extraído no cache, de forma atômica.
+    """
+    if _cache_dir is None or _read_only:
+        return
+
+    cache_file = get_cache_file(content_hash)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(model, file)
+    os.replace(temp_path, cache_file)
+
+
+def get_stats() -> Dict[str, int]:
+    return dict(_stats)
+
+
+def reset_stats():
+    _stats['hits'] = 0
+    _stats['misses'] = 0
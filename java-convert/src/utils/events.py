@@ -0,0 +1,205 @@
+import atexit
+import contextlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, TextIO, Tuple
+
+# Níveis das mensagens: abaixo do nível configurado, o evento só vai para o relatório
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+# Eventos que descrevem um arquivo criado, alterado ou mantido, listados no relatório
+ARTIFACT_EVENTS = ('created', 'updated', 'unchanged', 'skipped', 'removed', 'copied', 'moved', 'renamed')
+
+# Evento: nome, nível, etapa em execução e os campos informados (path, source, destination...)
+Event = Dict[str, object]
+
+_settings = {'level': 'info', 'record': False}
+
+_records: List[Event] = []
+
+# Tempo de cada etapa executada: nome, segundos e número de eventos
+_stages: List[Dict[str, object]] = []
+
+_current_stage: Optional[str] = None
+
+# Campos adicionados a todos os eventos registrados (ex.: o projeto em execução, no modo em lote)
+_context: Dict[str, object] = {}
+
+# Mensagens aguardando a gravação em segundo plano: (stream, texto)
+_pending: Optional[queue.Queue] = None
+_writer_pid: Optional[int] = None
+
+
+def configure_events(level: str = 'info', record: bool = False):
+    """
+    Configura o nível das mensagens exibidas e se os eventos são guardados para o relatório.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Nível inválido: {level}")
+    _settings['level'] = level
+    _settings['record'] = record
+
+
+def get_settings() -> Dict[str, object]:
+    return dict(_settings)
+
+
+def is_enabled_for(level: str) -> bool:
+    return LEVELS[level] >= LEVELS[_settings['level']]
+
+
+def write_loop(pending: queue.Queue):
+    """
+    Grava as mensagens pendentes, em lotes: cada escrita junta todas as mensagens
+    que chegaram enquanto a anterior era gravada.
+    """
+    while True:
+        items = [pending.get()]
+        while True:
+            try:
+                items.append(pending.get_nowait())
+            except queue.Empty:
+                break
+
+        batch_stream = None
+        batch = []
+        for stream, text in items + [(None, None)]:
+            if stream is not batch_stream and batch:
+                try:
+                    batch_stream.write(''.join(batch))
+                    batch_stream.flush()
+                except (OSError, ValueError):
+                    pass
+                batch = []
+            batch_stream = stream
+            if text is not None:
+                batch.append(text)
+
+        for _ in items:
+            pending.task_done()
+
+
+def get_pending_queue() -> queue.Queue:
+    """
+    Obtém a fila do gravador em segundo plano, criando a thread na primeira mensagem
+    (e novamente em um processo filho, que não herda a thread).
+    """
+    global _pending, _writer_pid
+    if _pending is None or _writer_pid != os.getpid():
+        _pending = queue.Queue()
+        _writer_pid = os.getpid()
+        threading.Thread(target=write_loop, args=(_pending,), name='events-writer', daemon=True).start()
+    return _pending
+
+
+def emit(event: str, message: Optional[str] = None, level: str = 'info', **fields):
+    """
+    Registra um evento. A mensagem, se houver e o nível permitir, é gravada em segundo plano
+    no stdout atual (ou no stderr, para avisos e erros).
+    """
+    if _settings['record']:
+        _records.append({'event': event, 'level': level, 'stage': _current_stage, **_context, **fields})
+
+    if message is not None and is_enabled_for(level):
+        stream: TextIO = sys.stderr if LEVELS[level] >= LEVELS['warning'] else sys.stdout
+        get_pending_queue().put((stream, message + '\n'))
+
+
+def flush():
+    """
+    Aguarda a gravação de todas as mensagens pendentes.
+    """
+    if _pending is not None and _writer_pid == os.getpid():
+        _pending.join()
+
+
+atexit.register(flush)
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """
+    Mede o tempo da etapa e associa a ela os eventos registrados durante a execução.
+    """
+    global _current_stage
+    previous_stage = _current_stage
+    _current_stage = name
+    events_before = len(_records)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stages.append({
+            'name': name,
+            'seconds': round(time.perf_counter() - start, 6),
+            'events': len(_records) - events_before,
+            **_context,
+        })
+        _current_stage = previous_stage
+
+
+@contextlib.contextmanager
+def context(**fields):
+    """
+    Adiciona os campos a todos os eventos e etapas registrados durante a execução.
+    """
+    previous = dict(_context)
+    _context.update(fields)
+    try:
+        yield
+    finally:
+        _context.clear()
+        _context.update(previous)
+
+
+def get_records() -> Tuple[List[Event], List[Dict[str, object]]]:
+    return list(_records), list(_stages)
+
+
+def add_records(records: List[Event], stages: List[Dict[str, object]], **fields):
+    """
+    Adiciona ao relatório os eventos e etapas de outro processo (ex.: um módulo do reactor).
+    """
+    _records.extend({**record, **fields} for record in records)
+    _stages.extend({**stage_info, **fields} for stage_info in stages)
+
+
+def reset():
+    global _current_stage
+    _records.clear()
+    _stages.clear()
+    _current_stage = None
+
+
+def build_report(summary: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """
+    Monta o relatório da execução: etapas com o tempo, arquivos (criados, ignorados, copiados,
+    renomeados...), demais avisos e erros e o resumo.
+    """
+    return {
+        'summary': summary or {},
+        'stages': list(_stages),
+        'artifacts': [record for record in _records if record['event'] in ARTIFACT_EVENTS],
+        'messages': [record for record in _records
+                     if record['event'] not in ARTIFACT_EVENTS and LEVELS[record['level']] >= LEVELS['warning']],
+    }
+
+
+def write_report(report_file: str, summary: Optional[Dict[str, object]] = None):
+    """
+    Grava o relatório em JSON ou, para arquivos .ndjson/.jsonl, um objeto JSON por linha
+    (com o campo 'type': summary, stage, artifact ou message).
+    """
+    report = build_report(summary)
+    with open(report_file, 'w') as file:
+        if os.path.splitext(report_file)[1] in ('.ndjson', '.jsonl'):
+            file.write(json.dumps({'type': 'summary', **report['summary']}) + '\n')
+            for record_type, key in (('stage', 'stages'), ('artifact', 'artifacts'), ('message', 'messages')):
+                for record in report[key]:
+                    file.write(json.dumps({'type': record_type, **record}) + '\n')
+        else:
+            json.dump(report, file, indent=4)
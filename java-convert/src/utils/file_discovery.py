@@ -0,0 +1,236 @@
+import fnmatch
+import functools
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils import profiler, vfs
+
+# Diretórios da raiz do projeto (ou do módulo) nunca percorridos: saída de build, com o código
+# gerado, e controle de versão. Abaixo da raiz, os mesmos nomes podem ser pacotes Java (ex.: services/build)
+DEFAULT_EXCLUDES = ('.git', 'target', 'build', '.java-convert-cache')
+
+# Arquivos com padrões no formato do .gitignore, lidos em cada diretório percorrido
+IGNORE_FILE_NAMES = ('.gitignore', '.javaconvertignore')
+
+# Regra de um arquivo de ignore: (diretório do arquivo, padrão, negação, apenas diretórios)
+IgnoreRule = Tuple[str, str, bool, bool]
+
+_settings: Dict[str, List[str]] = {'include': [], 'exclude': []}
+
+# stat dos arquivos encontrados na última varredura, para validar os caches sem um novo os.stat
+_stats: Dict[str, os.stat_result] = {}
+
+
+def configure_discovery(include: Optional[List[str]] = None, exclude: Optional[List[str]] = None):
+    """
+    Configura os globs de inclusão e exclusão usados em todas as varreduras.
+    Globs sem '/' são comparados com o nome do arquivo; os demais, com o caminho relativo à varredura.
+    """
+    _settings['include'] = list(include or [])
+    _settings['exclude'] = list(exclude or [])
+
+
+def get_settings() -> Dict[str, List[str]]:
+    return {key: list(value) for key, value in _settings.items()}
+
+
+def get_stat(path: str) -> Optional[os.stat_result]:
+    """
+    Obtém o stat do arquivo (caminho absoluto) guardado na última varredura, se houver.
+    """
+    return _stats.get(path)
+
+
+def read_ignore_file(directory: str) -> List[IgnoreRule]:
+    """
+    Lê as regras dos arquivos de ignore do diretório, se existirem.
+    """
+    rules = []
+    for file_name in IGNORE_FILE_NAMES:
+        try:
+            with open(os.path.join(directory, file_name), 'r') as file:
+                lines = file.read().splitlines()
+        except OSError:
+            continue
+
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            pattern = line[1:] if negated else line
+            dir_only = pattern.endswith('/')
+            pattern = pattern.strip('/')
+            if pattern:
+                rules.append((directory, pattern, negated, dir_only))
+    return rules
+
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern: str) -> 're.Pattern':
+    """
+    Converte um padrão com '/' do .gitignore em uma expressão regular: '*' e '?' não atravessam
+    '/', e '**' corresponde a zero ou mais segmentos do caminho (ex.: **/build, src/**/build, gen/**).
+    """
+    parts = pattern.split('/')
+    regex = ''
+    for position, part in enumerate(parts):
+        last = position == len(parts) - 1
+        if part == '**':
+            regex += '.*' if last else '(?:[^/]+/)*'
+            continue
+
+        index = 0
+        while index < len(part):
+            char = part[index]
+            end = part.find(']', index + 2) if char == '[' else -1
+            if char == '*':
+                regex += '[^/]*'
+            elif char == '?':
+                regex += '[^/]'
+            elif end != -1:
+                char_class = part[index + 1:end]
+                regex += '[' + ('^' + char_class[1:] if char_class.startswith('!') else char_class) + ']'
+                index = end
+            else:
+                regex += re.escape(char)
+            index += 1
+        if not last:
+            regex += '/'
+    return re.compile(regex)
+
+
+def matches_rule(rule: IgnoreRule, path: str, is_dir: bool) -> bool:
+    base, pattern, _, dir_only = rule
+    if dir_only and not is_dir:
+        return False
+
+    relative_path = os.path.relpath(path, base).replace(os.path.sep, '/')
+    if relative_path.startswith('..'):
+        return False
+    if '/' not in pattern:
+        return fnmatch.fnmatchcase(os.path.basename(path), pattern)
+    return compile_pattern(pattern).fullmatch(relative_path) is not None
+
+
+def is_ignored(path: str, is_dir: bool, rules: List[IgnoreRule]) -> bool:
+    """
+    Aplica as regras na ordem: a última regra que corresponde ao caminho decide.
+    """
+    ignored = False
+    for rule in rules:
+        if matches_rule(rule, path, is_dir):
+            ignored = not rule[2]
+    return ignored
+
+
+def matches_globs(relative_path: str, patterns: Iterable[str]) -> bool:
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(
+        fnmatch.fnmatchcase(relative_path if '/' in pattern else name, pattern)
+        for pattern in patterns
+    )
+
+
+def get_ancestor_rules(top: str, ignore_root: Optional[str]) -> List[IgnoreRule]:
+    """
+    Lê os arquivos de ignore dos diretórios entre ignore_root (inclusive) e top (exclusive).
+    """
+    if ignore_root is None:
+        return []
+
+    ignore_root = os.path.abspath(ignore_root)
+    relative_path = os.path.relpath(top, ignore_root)
+    if relative_path == os.curdir or relative_path.startswith('..'):
+        return []
+
+    rules = []
+    directory = ignore_root
+    for part in relative_path.split(os.path.sep):
+        rules.extend(read_ignore_file(directory))
+        directory = os.path.join(directory, part)
+    return rules
+
+
+def is_default_excluded(directory: str, root: str) -> bool:
+    """
+    Indica se o diretório é um dos diretórios padrão (target, .git...) da raiz do projeto ou do módulo.
+    """
+    return os.path.basename(directory) in DEFAULT_EXCLUDES and os.path.dirname(os.path.abspath(directory)) == root
+
+
+def iter_files(top: str, suffix: str = '.java', ignore_root: Optional[str] = None) -> Iterator[str]:
+    """
+    Percorre o diretório com os.scandir e retorna, à medida que são encontrados, os arquivos
+    com o sufixo informado. Ignora os diretórios padrão da raiz (ignore_root ou, sem ele, top), os globs de exclusão,
+    os arquivos fora dos globs de inclusão (quando informados) e as regras dos arquivos de ignore
+    do próprio diretório e, com ignore_root, dos diretórios acima dele.
+    """
+    if vfs.is_plan_mode():
+        yield from iter_plan_files(top, suffix, ignore_root)
+        return
+    if not os.path.isdir(top):
+        return
+
+    include = _settings['include']
+    exclude = _settings['exclude']
+    project_root = os.path.abspath(ignore_root or top)
+    pending = [(top, get_ancestor_rules(top, ignore_root))]
+    with profiler.span('file_discovery.iter_files', 'io'):
+        while pending:
+            directory, rules = pending.pop()
+            rules = rules + read_ignore_file(directory)
+            try:
+                # Lê as entradas do diretório antes de retornar os arquivos, que podem ser renomeados
+                with os.scandir(directory) as scanner:
+                    entries = sorted(scanner, key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            directories = []
+            for entry in entries:
+                relative_path = os.path.relpath(entry.path, top).replace(os.path.sep, '/')
+                if entry.is_dir(follow_symlinks=False):
+                    if (not is_default_excluded(entry.path, project_root) and not matches_globs(relative_path, exclude)
+                            and not is_ignored(entry.path, True, rules)):
+                        directories.append((entry.path, rules))
+                elif (entry.name.endswith(suffix) and not matches_globs(relative_path, exclude)
+                      and (not include or matches_globs(relative_path, include))
+                      and not is_ignored(entry.path, False, rules)):
+                    _stats[os.path.abspath(entry.path)] = entry.stat()
+                    yield entry.path
+
+            # Ordem de os.walk: os subdiretórios são percorridos em ordem alfabética
+            pending.extend(reversed(directories))
+
+
+def iter_plan_files(top: str, suffix: str, ignore_root: Optional[str]) -> Iterator[str]:
+    """
+    Varredura do modo de planejamento: percorre o sistema de arquivos virtual com as mesmas regras.
+    """
+    include = _settings['include']
+    exclude = _settings['exclude']
+    absolute_top = os.path.abspath(top)
+    project_root = os.path.abspath(ignore_root or top)
+    rules_by_dir = {}
+    for root, dirs, files in vfs.walk(absolute_top):
+        relative_root = os.path.relpath(root, absolute_top).replace(os.path.sep, '/')
+        if root == absolute_top:
+            rules = get_ancestor_rules(absolute_top, ignore_root)
+        else:
+            rules = rules_by_dir.get(os.path.dirname(root))
+            # Diretório pai ignorado, ou o próprio diretório ignorado
+            if rules is None or (is_default_excluded(root, project_root) or matches_globs(relative_root, exclude)
+                                 or is_ignored(root, True, rules)):
+                continue
+
+        rules = rules + read_ignore_file(root)
+        rules_by_dir[root] = rules
+        for file in files:
+            path = os.path.join(root, file)
+            relative_path = os.path.relpath(path, absolute_top).replace(os.path.sep, '/')
+            if (file.endswith(suffix) and not matches_globs(relative_path, exclude)
+                    and (not include or matches_globs(relative_path, include))
+                    and not is_ignored(path, False, rules)):
+                yield os.path.join(top, relative_path.replace('/', os.path.sep))
@@ -0,0 +1,115 @@
+import sys
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class FieldRecord(NamedTuple):
+    type: str
+    name: str
+
+
+class ImportRecord(NamedTuple):
+    # Tipo, membro estático ou, com wildcard, o pacote (ou tipo) cujos membros são importados
+    path: str
+    static: bool = False
+    wildcard: bool = False
+
+
+class MethodRecord(NamedTuple):
+    name: str
+    key: str
+    modifiers: Tuple[str, ...]
+    # Posição do texto do método (com as anotações) no código do arquivo
+    start: Optional[int]
+    end: Optional[int]
+    signature: Optional[str]
+    startline: Optional[int]
+    endline: Optional[int]
+
+
+class ClassRecord(NamedTuple):
+    name: str
+    fields: Tuple[FieldRecord, ...]
+    # Posições dos métodos da classe em FileRecord.methods
+    methods: Tuple[int, ...]
+
+
+class FileRecord(NamedTuple):
+    package_name: Optional[str]
+    class_name: Optional[str]
+    interfaces: Tuple[str, ...]
+    imports: Tuple[ImportRecord, ...]
+    classes: Tuple[ClassRecord, ...]
+    methods: Tuple[MethodRecord, ...]
+    # Código do arquivo, de onde o texto dos métodos é obtido sob demanda (não vai para o cache em disco)
+    code: Optional[str] = None
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """
+    Compartilha entre os arquivos a mesma instância de strings repetidas (imports, tipos, modificadores).
+    """
+    return sys.intern(value) if value is not None else None
+
+
+def get_method_text(model: FileRecord, method: MethodRecord) -> str:
+    if method.start is None:
+        return ""
+    return model.code[method.start:method.end]
+
+
+def get_class_methods(model: FileRecord, class_record: ClassRecord) -> List[MethodRecord]:
+    return [model.methods[position] for position in class_record.methods]
+
+
+def format_field(field: FieldRecord) -> str:
+    return f"private final {field.type} {field.name};"
+
+
+def format_import(record: ImportRecord) -> str:
+    """
+    Texto do import, sem a palavra import e o ';' (ex.: static org.junit.Assert.*).
+    """
+    return f"{'static ' if record.static else ''}{record.path}{'.*' if record.wildcard else ''}"
+
+
+def get_imported_type(record: ImportRecord) -> Optional[str]:
+    """
+    Nome simples do tipo importado, ou None para imports com * e de membros estáticos,
+    dos quais não é possível saber, pelo nome, o que é usado.
+    """
+    if record.static or record.wildcard:
+        return None
+    return record.path.rsplit('.', 1)[-1]
+
+
+def to_json(model: FileRecord) -> list:
+    """
+    Converte o modelo para o formato gravado no cache em disco, sem o código do arquivo.
+    """
+    return list(model[:-1])
+
+
+def from_json(data: list, code: str) -> FileRecord:
+    """
+    Reconstrói o modelo gravado no cache em disco.
+    """
+    package_name, class_name, interfaces, imports, classes, methods = data
+    return FileRecord(
+        package_name=intern(package_name),
+        class_name=class_name,
+        interfaces=tuple(interfaces),
+        imports=tuple(ImportRecord(intern(path), static, wildcard) for path, static, wildcard in imports),
+        classes=tuple(
+            ClassRecord(
+                name=name,
+                fields=tuple(FieldRecord(intern(field_type), field_name) for field_type, field_name in fields),
+                methods=tuple(positions),
+            )
+            for name, fields, positions in classes
+        ),
+        methods=tuple(
+            MethodRecord(name, key, tuple(intern(modifier) for modifier in modifiers), *span)
+            for name, key, modifiers, *span in methods
+        ),
+        code=code,
+    )
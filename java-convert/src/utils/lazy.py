@@ -0,0 +1,46 @@
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Callable, Union
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Importa o módulo sob demanda: o código do módulo só é executado no primeiro acesso
+    a um atributo. Usado nas dependências pesadas (javalang, jinja2, xmltodict...), para
+    que a inicialização da ferramenta não pague o custo de módulos que a execução não usa.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load(module: ModuleType) -> ModuleType:
+    """
+    Executa agora um módulo importado com lazy_import. O LazyLoader não é seguro entre threads:
+    o primeiro acesso deve ocorrer na thread principal, antes de iniciar um pool de threads.
+    """
+    getattr(module, '__name__')
+    return module
+
+
+def resolve(reference: Union[str, Callable]) -> Callable:
+    """
+    Obtém a função referenciada por 'pacote.modulo:funcao', importando o módulo apenas agora.
+    Funções já resolvidas são retornadas sem alteração.
+    """
+    if not isinstance(reference, str):
+        return reference
+    module_name, function_name = reference.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
@@ -0,0 +1,166 @@
+import os
+import secrets
+from typing import Dict, List, Set, Tuple
+
+from src.utils import events, profiler, vfs
+
+WRITTEN = 'written'
+UNCHANGED = 'unchanged'
+SKIPPED = 'skipped'
+
+EVENT_LABELS = {'created': 'Criado', 'updated': 'Atualizado', 'unchanged': 'Inalterado', 'skipped': 'Ignorado',
+                'removed': 'Removido'}
+
+# Arquivos renderizados aguardando gravação: (arquivo de destino, conteúdo, sobrescrever)
+_pending: List[Tuple[str, str, bool]] = []
+
+# Diretórios já criados (ou verificados) nesta execução
+_created_dirs: Set[str] = set()
+
+_stats = {WRITTEN: 0, UNCHANGED: 0, SKIPPED: 0}
+
+# Permissões de arquivos novos; o sistema aplica a umask do processo na criação
+NEW_FILE_MODE = 0o666
+
+
+def add_file(destination_file: str, content: str, overwrite: bool = True):
+    """
+    Adiciona um arquivo renderizado ao lote que será gravado em flush().
+    Com overwrite=False, um arquivo que já existe nunca é alterado.
+    """
+    _pending.append((destination_file, content, overwrite))
+
+
+def ensure_dir(directory: str):
+    """
+    Cria o diretório de destino, no máximo uma vez por execução.
+    """
+    if directory not in _created_dirs:
+        vfs.makedirs(directory)
+        _created_dirs.add(directory)
+
+
+def is_unchanged(destination_file: str, content: str) -> bool:
+    """
+    Verifica se o arquivo existente já tem o conteúdo informado.
+    """
+    try:
+        existing_content = vfs.read_text(destination_file)
+    except (OSError, UnicodeDecodeError):
+        return False
+    return existing_content == content
+
+
+def create_temp_file(destination_file: str) -> Tuple[int, str]:
+    """
+    Cria o arquivo temporário no diretório do destino, com as permissões padrão de um arquivo novo.
+    """
+    directory = os.path.dirname(destination_file)
+    while True:
+        temp_path = os.path.join(directory, f'.{os.path.basename(destination_file)}.{secrets.token_hex(4)}.tmp')
+        try:
+            return os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, NEW_FILE_MODE), temp_path
+        except FileExistsError:
+            continue
+
+
+def write_atomic(destination_file: str, content: str):
+    """
+    Grava o arquivo em um temporário no mesmo diretório e o renomeia para o destino.
+    """
+    if vfs.is_plan_mode():
+        vfs.write_text(destination_file, content)
+        return
+
+    if profiler.is_enabled():
+        profiler.count('files_written')
+        profiler.count('bytes_written', len(content.encode('utf-8')))
+
+    try:
+        mode = os.stat(destination_file).st_mode & 0o777
+    except OSError:
+        mode = None
+
+    fd, temp_path = create_temp_file(destination_file)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        if mode is not None:
+            # Um arquivo existente mantém as permissões que tinha
+            os.chmod(temp_path, mode)
+        os.replace(temp_path, destination_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_file(destination_file: str, content: str, overwrite: bool = True) -> str:
+    """
+    Grava o arquivo apenas se o conteúdo mudou. Retorna written, unchanged ou skipped.
+    """
+    with profiler.span('output_writer.write_file', 'io'):
+        ensure_dir(os.path.dirname(destination_file))
+
+        if vfs.exists(destination_file):
+            if not overwrite:
+                status = SKIPPED
+                event = 'skipped'
+            elif is_unchanged(destination_file, content):
+                status = UNCHANGED
+                event = 'unchanged'
+            else:
+                write_atomic(destination_file, content)
+                status = WRITTEN
+                event = 'updated'
+        else:
+            write_atomic(destination_file, content)
+            status = WRITTEN
+            event = 'created'
+
+    _stats[status] += 1
+    events.emit(event, f"{EVENT_LABELS[event]}: {destination_file}", 'debug', path=destination_file)
+    return status
+
+
+def remove_file(destination_file: str):
+    """
+    Remove um arquivo gerado que não é mais produzido pelo código de origem,
+    e o diretório dele, se ficar vazio.
+    """
+    if not vfs.exists(destination_file):
+        return
+
+    vfs.remove(destination_file)
+    events.emit('removed', f"{EVENT_LABELS['removed']}: {destination_file}", 'debug', path=destination_file)
+    if not vfs.is_plan_mode():
+        directory = os.path.dirname(destination_file)
+        try:
+            os.rmdir(directory)
+            _created_dirs.discard(directory)
+        except OSError:
+            pass
+
+
+def flush() -> List[Tuple[str, str]]:
+    """
+    Grava os arquivos pendentes, na ordem em que foram adicionados.
+    Retorna uma lista de (arquivo de destino, status).
+    """
+    pending = list(_pending)
+    _pending.clear()
+    return [
+        (destination_file, write_file(destination_file, content, overwrite))
+        for destination_file, content, overwrite in pending
+    ]
+
+
+def get_stats() -> Dict[str, int]:
+    return dict(_stats)
+
+
+def reset():
+    _pending.clear()
+    _created_dirs.clear()
+    for status in _stats:
+        _stats[status] = 0
@@ -0,0 +1,75 @@
+import functools
+import os
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from src.utils import disk_cache, events, file_discovery, lazy, profiler, restructure, templates
+
+futures = lazy.lazy_import('concurrent.futures')
+
+_jobs = os.cpu_count() or 1
+
+
+def set_jobs(jobs: Optional[int]):
+    """
+    Define o número de processos usados para analisar e renderizar os arquivos.
+    """
+    global _jobs
+    _jobs = max(1, jobs or os.cpu_count() or 1)
+
+
+def get_jobs() -> int:
+    return _jobs
+
+
+def init_worker(cache_dir: Optional[str], template_settings: dict, profiler_settings: dict,
+                discovery_settings: dict, restructure_settings: dict, event_settings: dict):
+    """
+    Replica no processo filho o estado necessário do processo principal.
+    """
+    disk_cache.set_cache_dir(cache_dir)
+    templates.configure_templates(**template_settings)
+    profiler.configure_profiler(**profiler_settings)
+    file_discovery.configure_discovery(**discovery_settings)
+    restructure.configure_restructure(**restructure_settings)
+    events.configure_events(**event_settings)
+
+
+def map_files(function: Callable, items: Iterable) -> List:
+    """
+    Aplica a função a cada item, distribuindo o trabalho em um pool de processos.
+    Os resultados são retornados na mesma ordem dos itens, como em uma execução serial.
+    A função e os resultados precisam ser serializáveis (pickle).
+    """
+    items = list(items)
+    return list(imap_files(function, items, window=max(1, len(items))))
+
+
+def imap_files(function: Callable, items: Iterable, window: Optional[int] = None) -> Iterator:
+    """
+    Como map_files, mas retorna os resultados à medida que são consumidos, em lotes de
+    no máximo window itens (padrão: 8 por processo), para que apenas um lote de
+    resultados fique em memória.
+    """
+    items = list(items)
+    if _jobs <= 1 or len(items) <= 1:
+        for item in items:
+            yield function(item)
+        return
+
+    workers = min(_jobs, len(items))
+    window = window or workers * 8
+    initargs = (disk_cache.get_cache_dir(), templates.get_settings(), profiler.get_settings(),
+                file_discovery.get_settings(), restructure.get_settings(), events.get_settings())
+    with futures.ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+        for batch_start in range(0, len(items), window):
+            batch = items[batch_start:batch_start + window]
+            chunksize = max(1, len(batch) // (workers * 4))
+            if not profiler.is_enabled():
+                yield from executor.map(function, batch, chunksize=chunksize)
+                continue
+
+            # Com o profiler ativo, as medições de cada chamada voltam junto com o resultado
+            for result, snapshot in executor.map(functools.partial(profiler.call_with_snapshot, function), batch,
+                                                 chunksize=chunksize):
+                profiler.merge_snapshot(snapshot)
+                yield result
@@ -1,35 +1,207 @@
 import os
-from typing import Dict, List, Union
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, List, Optional, Tuple, TypedDict
 
-import xmltodict
+from src.utils import lazy, profiler
 
-PomDependency = Dict[str, Union[str, None]]
+# Usado apenas para exibir o pom.xml completo (--show-info-only)
+xmltodict = lazy.lazy_import('xmltodict')
 
-PomProject = Dict[str, Union[
-    str,
-    List[PomDependency],
-]]
 
+class PomDependency(TypedDict):
+    group_id: Optional[str]
+    artifact_id: Optional[str]
+    version: Optional[str]
+    scope: Optional[str]
+    optional: bool
 
-def extract_pom_information(source_project_path: str) -> PomProject:
-    with open(os.path.join(source_project_path, 'pom.xml'), 'r') as file:
-        xml_string = file.read()
 
-    return xmltodict.parse(xml_string)
+class PomParent(TypedDict):
+    group_id: Optional[str]
+    artifact_id: Optional[str]
+    version: Optional[str]
+    relative_path: str
+
+
+class PomProject(TypedDict):
+    path: str
+    project_dir: str
+    group_id: Optional[str]
+    artifact_id: Optional[str]
+    version: Optional[str]
+    packaging: str
+    parent: Optional[PomParent]
+    modules: List[str]
+    dependencies: List[PomDependency]
+    source_directory: str
+    features: Dict[str, bool]
+
+
+# Dependências (artifactId) que ativam recursos na geração de código
+FEATURE_ARTIFACTS = {
+    'lombok': ('lombok',),
+    'jooq': ('jooq', 'spring-boot-starter-jooq'),
+}
+
+# pom.xml já lidos: caminho -> (mtime, tamanho, modelo)
+_poms: Dict[str, Tuple[int, int, PomProject]] = {}
+
+
+def extract_pom_information(source_project_path: str) -> Dict:
+    """
+    Lê o pom.xml completo como dicionário (usado para exibir as informações do projeto).
+    """
+    with profiler.span('pom_info.extract_pom_information'):
+        with open(os.path.join(source_project_path, 'pom.xml'), 'r') as file:
+            xml_string = file.read()
+
+        return xmltodict.parse(xml_string)
+
+
+def get_local_name(tag: str) -> str:
+    """
+    Remove o namespace da tag: {http://maven.apache.org/POM/4.0.0}groupId -> groupId.
+    """
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_pom(pom_path: str) -> PomProject:
+    """
+    Lê o pom.xml com iterparse, guardando apenas os elementos usados pela ferramenta.
+    """
+    values: Dict[str, str] = {}
+    parent: Dict[str, str] = {}
+    modules: List[str] = []
+    dependencies: List[PomDependency] = []
+    dependency: Dict[str, str] = {}
+    path: List[str] = []
+
+    for event, element in ElementTree.iterparse(pom_path, events=('start', 'end')):
+        name = get_local_name(element.tag)
+        if event == 'start':
+            path.append(name)
+            continue
+
+        text = (element.text or '').strip()
+        location = '/'.join(path)
+        if location in ('project/groupId', 'project/artifactId', 'project/version', 'project/packaging',
+                        'project/build/sourceDirectory'):
+            values[name] = text
+        elif location.startswith('project/parent/') and len(path) == 3:
+            parent[name] = text
+        elif location == 'project/modules/module':
+            modules.append(text)
+        elif location.startswith('project/dependencies/dependency/') and len(path) == 4:
+            dependency[name] = text
+        elif location == 'project/dependencies/dependency':
+            dependencies.append({
+                'group_id': dependency.get('groupId'),
+                'artifact_id': dependency.get('artifactId'),
+                'version': dependency.get('version'),
+                'scope': dependency.get('scope'),
+                'optional': dependency.get('optional') == 'true',
+            })
+            dependency = {}
+
+        path.pop()
+        # Libera os elementos já lidos; apenas o caminho atual é mantido em memória
+        if len(path) <= 2:
+            element.clear()
+
+    project_dir = os.path.dirname(os.path.abspath(pom_path))
+    pom_parent = None
+    if parent:
+        pom_parent = {
+            'group_id': parent.get('groupId'),
+            'artifact_id': parent.get('artifactId'),
+            'version': parent.get('version'),
+            'relative_path': parent.get('relativePath') or os.path.join('..', 'pom.xml'),
+        }
+
+    return {
+        'path': pom_path,
+        'project_dir': project_dir,
+        'group_id': values.get('groupId') or (pom_parent or {}).get('group_id'),
+        'artifact_id': values.get('artifactId'),
+        'version': values.get('version') or (pom_parent or {}).get('version'),
+        'packaging': values.get('packaging') or 'jar',
+        'parent': pom_parent,
+        'modules': modules,
+        'dependencies': dependencies,
+        'source_directory': values.get('sourceDirectory') or os.path.join('src', 'main', 'java'),
+        'features': {},
+    }
+
+
+def load_pom(project_source_path: str) -> PomProject:
+    """
+    Obtém o modelo do pom.xml do projeto, lendo o arquivo apenas quando ele muda (mtime e tamanho).
+    """
+    pom_path = os.path.abspath(os.path.join(project_source_path, 'pom.xml'))
+    stat = os.stat(pom_path)
+    cached = _poms.get(pom_path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with profiler.span('pom_info.load_pom'):
+        pom = parse_pom(pom_path)
+        pom['features'] = {
+            feature: any(dependency['artifact_id'] in artifacts for dependency in get_effective_dependencies(pom))
+            for feature, artifacts in FEATURE_ARTIFACTS.items()
+        }
+
+    _poms[pom_path] = (stat.st_mtime_ns, stat.st_size, pom)
+    return pom
+
+
+def get_parent_pom(pom: PomProject) -> Optional[PomProject]:
+    """
+    Obtém o pom.xml pai pelo relativePath, quando ele existe localmente e é o pai declarado.
+    """
+    if pom['parent'] is None:
+        return None
+
+    parent_path = os.path.normpath(os.path.join(pom['project_dir'], pom['parent']['relative_path']))
+    if os.path.isdir(parent_path):
+        parent_path = os.path.join(parent_path, 'pom.xml')
+    if not os.path.isfile(parent_path) or os.path.abspath(parent_path) == pom['path']:
+        return None
+
+    parent = load_pom(os.path.dirname(parent_path))
+    if parent['artifact_id'] != pom['parent']['artifact_id']:
+        return None
+    return parent
+
+
+def get_effective_dependencies(pom: PomProject) -> List[PomDependency]:
+    """
+    Obtém as dependências do projeto, incluindo as herdadas do pom.xml pai.
+    """
+    parent = get_parent_pom(pom)
+    if parent is None:
+        return pom['dependencies']
+    return pom['dependencies'] + get_effective_dependencies(parent)
+
+
+def get_module_paths(pom: PomProject) -> List[str]:
+    """
+    Obtém os diretórios dos módulos declarados em <modules>.
+    """
+    return [os.path.normpath(os.path.join(pom['project_dir'], module)) for module in pom['modules']]
+
+
+def get_source_root(pom: PomProject, project_source_path: str) -> str:
+    src = os.path.join(project_source_path, pom['source_directory'])
+    return os.path.join(src, pom['group_id'].replace('.', os.path.sep), pom['artifact_id'])
+
+
+def has_lombok(pom: PomProject) -> bool:
+    return pom['features']['lombok']
 
 
 def get_dir_source_code_path(project_source_path: str) -> str:
-    pom = extract_pom_information(project_source_path)
-    group_id = pom['project']['groupId']
-    artifact_id = pom['project']['artifactId']
-    src = os.path.join(project_source_path, 'src', 'main', 'java')
-    return os.path.join(src, group_id.replace('.', os.path.sep), artifact_id)
+    return get_source_root(load_pom(project_source_path), project_source_path)
 
 
 def active_lombok(project_source_path: str):
-    pom = extract_pom_information(project_source_path)
-    dependencies = pom['project']['dependencies']['dependency']
-    for dependency in dependencies:
-        if dependency.get("artifactId") == "lombok":
-            return True
-    return False
+    return has_lombok(load_pom(project_source_path))
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+# Desativado por padrão: span() retorna um objeto vazio e count() só testa esta variável
+_enabled = False
+_trace = False
+
+_counters: Dict[str, int] = {}
+
+# Tempo total e número de chamadas por nome
+_timers: Dict[str, List[float]] = {}
+
+# Eventos no formato Chrome trace (chrome://tracing, Perfetto)
+_events: List[Dict] = []
+
+_origin = time.perf_counter()
+
+
+class Span:
+    __slots__ = ('name', 'category', 'start')
+
+    def __init__(self, name: str, category: str):
+        self.name = name
+        self.category = category
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        timer = _timers.setdefault(self.name, [0.0, 0])
+        timer[0] += end - self.start
+        timer[1] += 1
+        if _trace:
+            _events.append({
+                'name': self.name,
+                'cat': self.category,
+                'ph': 'X',
+                'ts': round((self.start - _origin) * 1e6, 3),
+                'dur': round((end - self.start) * 1e6, 3),
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+            })
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+def enable_profiler(trace: bool = False):
+    global _enabled, _trace
+    _enabled = True
+    _trace = trace
+
+
+def disable_profiler():
+    global _enabled, _trace
+    _enabled = False
+    _trace = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def get_settings() -> Dict:
+    return {'enabled': _enabled, 'trace': _trace, 'origin': _origin}
+
+
+def configure_profiler(enabled: bool, trace: bool, origin: float):
+    """
+    Replica em um processo filho a configuração do processo principal.
+    A mesma origem mantém os eventos dos processos na mesma linha do tempo.
+    """
+    global _origin
+    _origin = origin
+    if enabled:
+        enable_profiler(trace)
+    else:
+        disable_profiler()
+
+
+def span(name: str, category: str = 'util'):
+    """
+    Mede o tempo de um trecho: with profiler.span('javalang.parse'): ...
+    """
+    if not _enabled:
+        return NULL_SPAN
+    return Span(name, category)
+
+
+def count(name: str, value: int = 1):
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def reset():
+    _counters.clear()
+    _timers.clear()
+    _events.clear()
+
+
+def get_snapshot() -> Dict:
+    return {'counters': dict(_counters), 'timers': {name: list(timer) for name, timer in _timers.items()},
+            'events': list(_events)}
+
+
+def merge_snapshot(snapshot: Dict):
+    """
+    Soma ao processo principal as medições feitas em um processo filho.
+    """
+    for name, value in snapshot['counters'].items():
+        _counters[name] = _counters.get(name, 0) + value
+    for name, (total, calls) in snapshot['timers'].items():
+        timer = _timers.setdefault(name, [0.0, 0])
+        timer[0] += total
+        timer[1] += calls
+    _events.extend(snapshot['events'])
+
+
+def call_with_snapshot(function: Callable, item) -> Tuple[object, Dict]:
+    """
+    Executa a função em um processo filho e retorna o resultado com as medições da chamada.
+    """
+    reset()
+    result = function(item)
+    return result, get_snapshot()
+
+
+def format_report() -> str:
+    """
+    Formata a tabela de tempos (ordenada pelo tempo total) e os contadores.
+    """
+    lines = [f"{'Trecho':<40} {'Chamadas':>10} {'Total (s)':>12} {'Média (ms)':>12}"]
+    for name, (total, calls) in sorted(_timers.items(), key=lambda item: item[1][0], reverse=True):
+        lines.append(f"{name:<40} {calls:>10} {total:>12.4f} {total / calls * 1000:>12.3f}")
+
+    lines.append('')
+    lines.append(f"{'Contador':<40} {'Valor':>10}")
+    for name, value in sorted(_counters.items()):
+        lines.append(f"{name:<40} {value:>10}")
+    return '\n'.join(lines)
+
+
+def write_trace(trace_file: str):
+    """
+    Grava os eventos no formato Chrome trace JSON.
+    """
+    with open(trace_file, 'w') as f:
+        json.dump({'traceEvents': _events, 'displayTimeUnit': 'ms'}, f)
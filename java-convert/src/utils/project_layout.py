@@ -0,0 +1,80 @@
+import os
+from typing import Dict, List, Optional, Union
+
+from src.utils import file_discovery, pom_info, profiler
+
+ProjectLayout = Dict[str, Union[str, bool, pom_info.PomProject, Dict[str, List[str]]]]
+
+# Layouts já resolvidos, pelo caminho absoluto do projeto
+_layouts: Dict[str, ProjectLayout] = {}
+
+
+def scan_java_files(source_root: str, ignore_root: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Percorre o diretório de código uma única vez e agrupa os arquivos .java
+    pelo primeiro diretório abaixo da raiz (services, controller, repository...).
+    """
+    java_files = {}
+    with profiler.span('project_layout.scan_java_files', 'io'):
+        for source_file in file_discovery.iter_files(source_root, ignore_root=ignore_root):
+            relative_path = os.path.relpath(source_file, source_root)
+            top_dir = os.path.dirname(relative_path).split(os.path.sep)[0]
+            java_files.setdefault(top_dir, []).append(source_file)
+    return java_files
+
+
+def load_project_layout(source_directory: str) -> ProjectLayout:
+    """
+    Resolve o layout do projeto: lê o pom.xml e varre o código fonte uma única vez.
+    """
+    pom = pom_info.load_pom(source_directory)
+    source_root = pom_info.get_source_root(pom, source_directory)
+    layout = {
+        'source_directory': source_directory,
+        'pom': pom,
+        'source_root': source_root,
+        'lombok': pom_info.has_lombok(pom),
+        'java_files': scan_java_files(source_root, source_directory),
+    }
+    _layouts[os.path.abspath(source_directory)] = layout
+    return layout
+
+
+def get_project_layout(source_directory: str) -> ProjectLayout:
+    """
+    Obtém o layout do projeto, resolvendo-o apenas na primeira chamada.
+    """
+    layout = _layouts.get(os.path.abspath(source_directory))
+    if layout is None:
+        layout = load_project_layout(source_directory)
+    return layout
+
+
+def update_java_files(layout: ProjectLayout, changed_files: List[str], removed_files: List[str]):
+    """
+    Atualiza a varredura do layout com os arquivos criados ou alterados e os removidos (modo watch).
+    """
+    removed_files = set(removed_files)
+    for files in layout['java_files'].values():
+        files[:] = [source_file for source_file in files if source_file not in removed_files]
+    for source_file in changed_files:
+        relative_path = os.path.relpath(source_file, layout['source_root'])
+        files = layout['java_files'].setdefault(os.path.dirname(relative_path).split(os.path.sep)[0], [])
+        if source_file not in files:
+            files.append(source_file)
+
+
+def get_java_files(layout: ProjectLayout, source_path: Optional[str]) -> List[str]:
+    """
+    Obtém, a partir da varredura, os arquivos .java dentro do diretório informado.
+    """
+    if source_path is None:
+        return []
+
+    relative_path = os.path.relpath(source_path, layout['source_root'])
+    top_dir = relative_path.split(os.path.sep)[0]
+    prefix = os.path.join(source_path, '')
+    return [
+        source_file for source_file in layout['java_files'].get(top_dir, [])
+        if source_file.startswith(prefix)
+    ]
@@ -0,0 +1,293 @@
+import errno
+import json
+import os
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.utils import disk_cache, events, lazy, output_writer, parallel, profiler, util, vfs
+
+javalang = lazy.lazy_import('javalang')
+futures = lazy.lazy_import('concurrent.futures')
+
+try:
+    import fcntl
+except ImportError:
+    # Sem fcntl (Windows), o modo reflink faz a cópia completa
+    fcntl = None
+
+# Modos de transferência dos arquivos copiados:
+# copy (cópia completa), hardlink, reflink (cópia sob demanda do sistema de arquivos) ou move.
+# hardlink e reflink valem apenas para os arquivos transferidos sem alterações: um .java com o
+# pacote ou a classe reescritos é gravado como um arquivo novo (ver execute_file)
+MODES = ('copy', 'hardlink', 'reflink', 'move')
+
+# ioctl FICLONE do Linux (btrfs, xfs...), usado no modo reflink
+FICLONE = 0x40049409
+
+# Operação planejada: action ('mkdir', 'copy' ou 'rename'), source e destination
+Operation = Dict[str, Optional[str]]
+
+RENAMES_FILE_NAME = 'renames.json'
+
+EVENT_LABELS = {'copied': 'Copiado', 'moved': 'Movido'}
+
+_settings = {'mode': 'copy'}
+
+# Tipos realocados nesta execução: nome qualificado antigo -> novo
+_renames: Dict[str, str] = {}
+
+
+def configure_restructure(mode: str = 'copy'):
+    if mode not in MODES:
+        raise ValueError(f"Modo de reestruturação inválido: {mode}")
+    _settings['mode'] = mode
+
+
+def get_settings() -> Dict[str, str]:
+    return dict(_settings)
+
+
+def reset_renames():
+    _renames.clear()
+
+
+def get_project_renames() -> Dict[str, str]:
+    """
+    Obtém os tipos realocados nesta e nas execuções anteriores (guardados no cache em disco),
+    já que um pacote copiado antes não é copiado de novo, mas as referências continuam a ser geradas.
+    Um tipo já realocado mantém o primeiro destino: uma cópia posterior não altera o mapeamento.
+    """
+    renames = {}
+    renames_file = None
+    cache_dir = disk_cache.get_cache_dir()
+    if cache_dir is not None:
+        renames_file = os.path.join(cache_dir, RENAMES_FILE_NAME)
+        try:
+            with open(renames_file, 'r') as file:
+                renames = json.load(file)
+        except (OSError, ValueError):
+            pass
+
+    new_renames = {old_name: new_name for old_name, new_name in _renames.items() if old_name not in renames}
+    renames.update(new_renames)
+    if renames_file is not None and not disk_cache.is_read_only() and new_renames:
+        output_writer.write_atomic(renames_file, json.dumps(renames, indent=4, sort_keys=True))
+    return renames
+
+
+def plan_tree(source_path: str, destination_path: str, action: str = 'copy',
+              rename_file: Callable[[str], str] = None) -> List[Operation]:
+    """
+    Planeja a cópia (ou a movimentação, com action='rename') de uma árvore de diretórios.
+    rename_file, quando informado, define o novo nome de cada arquivo .java.
+    """
+    operations = []
+    for root, dirs, files in vfs.walk(source_path):
+        relative_root = os.path.relpath(root, source_path)
+        destination_root = os.path.normpath(os.path.join(destination_path, relative_root))
+        operations.append({'action': 'mkdir', 'source': None, 'destination': destination_root})
+        for file in files:
+            new_name = rename_file(file) if rename_file is not None and file.endswith('.java') else file
+            source = os.path.join(root, file)
+            destination = os.path.join(destination_root, new_name)
+            if source != destination:
+                operations.append({'action': action, 'source': source, 'destination': destination})
+    return operations
+
+
+def plan_copy_dirs(source_directory: str, dir_name: str, names: List[str]) -> List[Operation]:
+    """
+    Planeja a cópia dos diretórios informados para dentro de dir_name:
+    diretórios que já existem no destino não são copiados.
+    """
+    operations = []
+    for name in names:
+        source_path = os.path.join(source_directory, name)
+        destination_path = os.path.join(source_directory, dir_name, name)
+        if vfs.exists(source_path) and not vfs.exists(destination_path):
+            operations.extend(plan_tree(source_path, destination_path))
+    return operations
+
+
+def get_moved_package(package_name: str, old_dir: str, new_dir: str) -> Optional[str]:
+    """
+    Obtém o pacote de um arquivo movido de old_dir para new_dir, se o pacote atual
+    corresponde ao diretório (io/demo/shop/model -> io.demo.shop.model).
+    """
+    parts = package_name.split('.')
+    old_parts = os.path.abspath(old_dir).split(os.path.sep)
+    if old_parts[-len(parts):] != parts:
+        return None
+
+    package_root = os.path.sep.join(old_parts[:-len(parts)])
+    relative_path = os.path.relpath(os.path.abspath(new_dir), package_root)
+    if relative_path == os.curdir or relative_path.startswith(os.pardir):
+        return None
+    return relative_path.replace(os.path.sep, '.')
+
+
+def rewrite_java_source(code: str, old_dir: str, new_dir: str, old_class: str,
+                        new_class: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Atualiza, em uma única passagem pelos tokens, a declaração package de acordo com o novo
+    diretório e os identificadores da classe renomeada (declaração, construtores e referências).
+    Strings e comentários não são alterados.
+    Retorna (código, pacote antigo, pacote novo).
+    """
+    line_offsets = util.get_line_offsets(code)
+    edits = []
+    package_name = None
+    new_package = None
+    package_tokens = None
+    for token in javalang.tokenizer.tokenize(code):
+        if package_tokens is not None:
+            if token.value == ';':
+                package_name = ''.join(package_token.value for package_token in package_tokens)
+                new_package = get_moved_package(package_name, old_dir, new_dir) or package_name
+                if new_package != package_name:
+                    edits.append((package_tokens[0], package_tokens[-1], new_package))
+                package_tokens = None
+            else:
+                package_tokens.append(token)
+        elif token.value == 'package' and isinstance(token, javalang.tokenizer.Keyword) and package_name is None:
+            package_tokens = []
+        elif old_class != new_class and token.value == old_class and isinstance(token, javalang.tokenizer.Identifier):
+            edits.append((token, token, new_class))
+
+    def get_offset(token):
+        return line_offsets[token.position.line - 1] + token.position.column - 1
+
+    parts = []
+    position = 0
+    for first, last, text in edits:
+        start = get_offset(first)
+        parts.append(code[position:start])
+        parts.append(text)
+        position = get_offset(last) + len(last.value)
+    parts.append(code[position:])
+    return ''.join(parts), package_name, new_package
+
+
+def clone_file(source: str, destination: str):
+    """
+    Copia o arquivo de acordo com o modo, voltando para a cópia completa quando
+    o sistema de arquivos não suporta hardlink ou reflink.
+    """
+    mode = _settings['mode']
+    if mode == 'move':
+        os.replace(source, destination)
+        return
+    if mode == 'hardlink':
+        try:
+            os.link(source, destination)
+            return
+        except OSError:
+            pass
+    elif mode == 'reflink' and fcntl is not None:
+        try:
+            with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+                fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+            shutil.copystat(source, destination)
+            return
+        except OSError as error:
+            if error.errno not in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+                raise
+    shutil.copy2(source, destination)
+
+
+def execute_file(operation: Operation) -> Optional[Tuple[str, str]]:
+    """
+    Executa a cópia ou a movimentação de um arquivo. Arquivos .java que mudam de diretório
+    ou de nome são lidos uma única vez e gravados já com o pacote e a classe atualizados.
+    Retorna (nome qualificado antigo, novo) do tipo realocado, se houver.
+    """
+    source = operation['source']
+    destination = operation['destination']
+    moving = operation['action'] == 'rename' or _settings['mode'] == 'move'
+    if destination.endswith('.java'):
+        old_class = os.path.splitext(os.path.basename(source))[0]
+        new_class = os.path.splitext(os.path.basename(destination))[0]
+        code = vfs.read_text(source)
+        try:
+            new_code, package_name, new_package = rewrite_java_source(
+                code, os.path.dirname(source), os.path.dirname(destination), old_class, new_class
+            )
+        except javalang.tokenizer.LexerError:
+            # Arquivo inválido: é transferido sem alterações
+            new_code, package_name, new_package = code, None, None
+        if new_code != code:
+            if vfs.is_plan_mode():
+                vfs.write_text(destination, new_code)
+            else:
+                with open(destination, 'w') as file:
+                    file.write(new_code)
+                shutil.copymode(source, destination)
+            if moving:
+                vfs.remove(source)
+            if package_name is None:
+                return None
+            return f"{package_name}.{old_class}", f"{new_package}.{new_class}"
+
+    if vfs.is_plan_mode():
+        if moving:
+            vfs.rename(source, destination)
+        else:
+            vfs.copy_file(source, destination)
+    elif operation['action'] == 'rename':
+        os.replace(source, destination)
+    else:
+        clone_file(source, destination)
+    return None
+
+
+def remove_empty_dirs(directories: List[str]):
+    """
+    Remove os diretórios de origem que ficaram vazios, dos mais profundos para os mais rasos.
+    """
+    for directory in sorted(set(directories), key=lambda path: path.count(os.path.sep), reverse=True):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def execute(operations: List[Operation]) -> int:
+    """
+    Executa as operações planejadas: cria os diretórios e, em seguida, transfere os arquivos
+    em um pool de threads. Retorna o número de arquivos transferidos.
+    """
+    file_operations = [operation for operation in operations if operation['action'] != 'mkdir']
+    with profiler.span('restructure.execute', 'io'):
+        for operation in operations:
+            if operation['action'] == 'mkdir':
+                vfs.makedirs(operation['destination'])
+
+        if vfs.is_plan_mode() or parallel.get_jobs() <= 1 or len(file_operations) <= 1:
+            renames = [execute_file(operation) for operation in file_operations]
+        else:
+            # As threads usam o javalang: ele é carregado antes, na thread principal
+            lazy.load(javalang)
+            with futures.ThreadPoolExecutor() as executor:
+                renames = list(executor.map(execute_file, file_operations))
+
+        moved = [operation for operation in file_operations
+                 if operation['action'] == 'rename' or _settings['mode'] == 'move']
+        if moved and not vfs.is_plan_mode():
+            remove_empty_dirs([os.path.dirname(operation['source']) for operation in moved])
+
+    for operation, rename in zip(file_operations, renames):
+        event = 'moved' if operation['action'] == 'rename' or _settings['mode'] == 'move' else 'copied'
+        events.emit(event, f"{EVENT_LABELS[event]}: {operation['source']} -> {operation['destination']}", 'debug',
+                    source=operation['source'], destination=operation['destination'])
+        if rename is not None:
+            events.emit('renamed', f"Tipo renomeado: {rename[0]} -> {rename[1]}", 'debug',
+                        source=rename[0], destination=rename[1], kind='type')
+
+    for rename in renames:
+        if rename is not None:
+            _renames.setdefault(*rename)
+    if any(rename is not None for rename in renames):
+        # Guarda os tipos realocados mesmo sem a etapa de referências, para uma execução futura com ela
+        get_project_renames()
+    profiler.count('files_restructured', len(file_operations))
+    return len(file_operations)
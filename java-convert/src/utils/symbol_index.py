@@ -0,0 +1,186 @@
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.utils import disk_cache, vfs
+
+# Índice de símbolos do projeto:
+# 'files': arquivo -> hash, tipo declarado (nome qualificado) e tipos referenciados (imports e dependências)
+# 'outputs': arquivo gerado -> arquivo de origem, etapa e método que o geraram
+SymbolIndex = Dict[str, Dict[str, Dict]]
+
+INDEX_FILE_NAME = 'symbols.json'
+
+_index: SymbolIndex = {'fingerprint': None, 'files': {}, 'outputs': {}}
+
+_index_file: Optional[str] = None
+
+
+def load_index():
+    """
+    Carrega o índice gravado no diretório do cache, se o cache estiver ativo.
+    Sem o cache, o índice fica apenas em memória.
+    """
+    global _index, _index_file
+    _index = {'fingerprint': None, 'files': {}, 'outputs': {}}
+    _index_file = None
+
+    cache_dir = disk_cache.get_cache_dir()
+    if cache_dir is None:
+        return
+
+    _index_file = os.path.join(cache_dir, INDEX_FILE_NAME)
+    try:
+        with open(_index_file, 'r') as file:
+            _index = json.load(file)
+    except (OSError, ValueError):
+        pass
+
+
+def save_index():
+    if _index_file is None or disk_cache.is_read_only():
+        return
+
+    os.makedirs(os.path.dirname(_index_file), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(_index_file), suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(_index, file)
+    os.replace(temp_path, _index_file)
+
+
+def set_fingerprint(fingerprint: str):
+    """
+    Informa a configuração que influencia o código gerado (etapas, pom.xml, templates).
+    Se ela mudou desde a última execução, os arquivos analisados são descartados e todos são processados
+    novamente. Os arquivos gerados continuam registrados, para que os que não forem mais gerados sejam removidos.
+    """
+    if _index['fingerprint'] != fingerprint:
+        _index.update({'fingerprint': fingerprint, 'files': {}})
+
+
+def resolve_type(type_name: str, imports: Iterable[str], package_name: Optional[str]) -> str:
+    """
+    Obtém o nome qualificado de um tipo pelo import correspondente ou, sem import, pelo pacote do arquivo.
+    """
+    for import_path in imports:
+        if import_path.endswith(f'.{type_name}'):
+            return import_path
+    return f'{package_name}.{type_name}' if package_name else type_name
+
+
+def update_file(unit: Dict):
+    """
+    Atualiza no índice os símbolos de um arquivo analisado (JavaUnit).
+    """
+    model = unit['model']
+    imports = [record.path for record in model.imports if not record.static]
+    package_name = model.package_name
+    references = set(imports)
+    for class_info in model.classes:
+        for field in class_info.fields:
+            references.add(resolve_type(field.type, imports, package_name))
+
+    declared = model.class_name or (model.interfaces[0] if model.interfaces else None)
+    _index['files'][unit['path']] = {
+        'hash': unit['hash'],
+        'type': f'{package_name}.{declared}' if package_name and declared else declared,
+        'references': sorted(references),
+    }
+
+
+def record_output(output_file: str, source_file: str, stage: Optional[str] = None, method: Optional[str] = None):
+    """
+    Registra de qual arquivo (e método) de origem um arquivo foi gerado.
+    """
+    _index['outputs'][os.path.abspath(output_file)] = {
+        'source': os.path.abspath(source_file),
+        'stage': stage,
+        'method': method,
+    }
+
+
+def take_outputs(source_files: Iterable[str], stage: str) -> List[str]:
+    """
+    Retira do índice os arquivos gerados pela etapa a partir dos arquivos de origem informados.
+    Depois de a etapa processar esses arquivos novamente, os que não forem registrados de novo
+    estão obsoletos (ex.: o caso de uso de um método renomeado ou removido).
+    """
+    source_files = {os.path.abspath(path) for path in source_files}
+    outputs = sorted(
+        output for output, info in _index['outputs'].items()
+        if info['source'] in source_files and info['stage'] == stage
+    )
+    for output in outputs:
+        del _index['outputs'][output]
+    return outputs
+
+
+def get_stale_outputs(previous_outputs: Iterable[str]) -> List[str]:
+    """
+    Obtém, dos arquivos retirados com take_outputs, os que não foram gerados novamente.
+    """
+    return [output for output in previous_outputs if output not in _index['outputs']]
+
+
+def take_orphan_outputs() -> List[str]:
+    """
+    Retira do índice os arquivos de origem removidos e os arquivos gerados a partir deles, que são retornados.
+    """
+    outputs = sorted(output for output, info in _index['outputs'].items() if not vfs.exists(info['source']))
+    for output in outputs:
+        del _index['outputs'][output]
+    for path in [path for path in _index['files'] if not vfs.exists(path)]:
+        del _index['files'][path]
+    return outputs
+
+
+def get_dependents(source_files: Iterable[str]) -> Set[str]:
+    """
+    Obtém os arquivos que referenciam (import ou dependência) os tipos declarados nos arquivos informados.
+    """
+    types = {_index['files'][path]['type'] for path in source_files if path in _index['files']}
+    types.discard(None)
+    return {path for path, info in _index['files'].items() if types.intersection(info['references'])}
+
+
+def get_changed_files(units: Iterable[Dict]) -> Set[str]:
+    """
+    Obtém os arquivos novos ou alterados desde a última execução, e os arquivos
+    cujas saídas registradas não existem mais.
+    """
+    changed = set()
+    for unit in units:
+        info = _index['files'].get(unit['path'])
+        if info is None or info['hash'] != unit['hash']:
+            changed.add(unit['path'])
+
+    for output_file, info in _index['outputs'].items():
+        if not os.path.exists(output_file):
+            changed.add(info['source'])
+    return changed
+
+
+def get_affected_files(changed_files: Iterable[str]) -> Set[str]:
+    """
+    Obtém o conjunto mínimo de arquivos de origem a processar novamente: os alterados e os que
+    referenciam diretamente os tipos declarados neles (por exemplo, o controller que usa um serviço).
+    O código gerado de um arquivo só depende do próprio arquivo e dos tipos que ele referencia,
+    então não é preciso seguir as dependências de forma transitiva.
+    """
+    changed_files = set(changed_files)
+    return changed_files | get_dependents(changed_files)
+
+
+def update_files(units: Iterable[Dict]) -> Set[str]:
+    """
+    Atualiza o índice com os arquivos analisados e retorna os arquivos afetados pelas alterações.
+    Os dependentes são obtidos antes e depois da atualização, para cobrir tipos renomeados.
+    """
+    units = list(units)
+    changed_files = get_changed_files(units)
+    affected = get_affected_files(changed_files)
+    for unit in units:
+        if unit['path'] in changed_files:
+            update_file(unit)
+    return affected | get_affected_files(changed_files)
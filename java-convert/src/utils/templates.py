@@ -0,0 +1,55 @@
+from typing import Dict, Optional
+
+from src.utils import lazy, util
+
+jinja2 = lazy.lazy_import('jinja2')
+
+_settings: Dict[str, Optional[str]] = {'override_dir': None, 'bytecode_cache_dir': None}
+
+_environment: Optional['jinja2.Environment'] = None
+
+
+def configure_templates(override_dir: Optional[str] = None, bytecode_cache_dir: Optional[str] = None):
+    """
+    Configura o carregamento dos templates.
+    Os templates em override_dir têm prioridade sobre os templates padrão, e os templates
+    compilados são guardados em bytecode_cache_dir para serem reaproveitados entre execuções.
+    """
+    global _environment
+    _settings['override_dir'] = override_dir
+    _settings['bytecode_cache_dir'] = bytecode_cache_dir
+    _environment = None
+
+
+def get_settings() -> Dict[str, Optional[str]]:
+    return dict(_settings)
+
+
+def get_environment() -> 'jinja2.Environment':
+    """
+    Obtém o Environment compartilhado, criado apenas na primeira chamada.
+    """
+    global _environment
+    if _environment is None:
+        search_path = [util.get_templates_dir()]
+        if _settings['override_dir'] is not None:
+            search_path.insert(0, _settings['override_dir'])
+
+        bytecode_cache = None
+        if _settings['bytecode_cache_dir'] is not None:
+            bytecode_cache = jinja2.FileSystemBytecodeCache(_settings['bytecode_cache_dir'])
+
+        # auto_reload desativado: cada template é compilado uma única vez por processo
+        _environment = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(search_path),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,
+        )
+    return _environment
+
+
+def get_template(template_name: str) -> 'jinja2.Template':
+    """
+    Obtém o template compilado pelo nome do arquivo.
+    """
+    return get_environment().get_template(template_name)
@@ -1,8 +1,24 @@
+import hashlib
+import bisect
 import os
 import shutil
-from typing import List
+from typing import Dict, List, Tuple, Union
 
-import javalang
+
+from src.utils import disk_cache, file_discovery, java_model, lazy, parallel, profiler
+
+javalang = lazy.lazy_import('javalang')
+
+# Arquivo analisado: caminho, mtime, tamanho, hash e modelo extraído (java_model.FileRecord)
+JavaUnit = Dict[str, Union[str, int, bool, java_model.FileRecord]]
+
+JavaHeader = Dict[str, Union[str, int, None, List[str]]]
+
+# Cache de arquivos já analisados, compartilhado por todas as etapas do processo
+_java_units: Dict[str, JavaUnit] = {}
+
+# Cache dos cabeçalhos (pacote, tipo e imports) dos arquivos
+_java_headers: Dict[str, JavaHeader] = {}
 
 
 def get_class_name(tree):
@@ -15,122 +31,153 @@ def get_class_name(tree):
     return None
 
 
-def get_interface_name(tree):
+def get_line_offsets(code) -> List[int]:
     """
-    Obtém o nome da interface Java no código fornecido.
+    Obtém a posição, no código, do início de cada linha.
     """
-    for path, node in tree:
-        if isinstance(node, javalang.tree.InterfaceDeclaration):
-            return node.name
-    return None
-
+    offsets = [0]
+    position = code.find('\n')
+    while position != -1:
+        offsets.append(position + 1)
+        position = code.find('\n', position + 1)
+    return offsets
 
-def is_interface(tree) -> bool:
-    return any(isinstance(node, javalang.tree.InterfaceDeclaration) for path, node in tree)
 
-
-def is_classe(tree) -> bool:
-    return any(isinstance(node, javalang.tree.ClassDeclaration) for path, node in tree)
-
-
-def extract_fields(node):
+def find_member_start(tokens, index) -> int:
     """
-    Extrai os campos (fields) de uma classe Java.
+    Volta do token informado até o fim da declaração anterior (';', '{' ou '}' fora de parênteses),
+    incluindo os modificadores, as anotações (com argumentos) e os parâmetros de tipo do membro.
     """
-    fields = []
-    for field_declaration in node.fields:
-        field_type = field_declaration.type.name
-        field_name = field_declaration.declarators[0].name
-        fields.append(f"private final {field_type} {field_name};")
-    return fields
+    depth = 0
+    while index > 0:
+        value = tokens[index - 1].value
+        if value == ')':
+            depth += 1
+        elif value == '(':
+            depth -= 1
+        elif depth == 0 and value in ('{', '}', ';'):
+            break
+        index -= 1
+    return index
 
 
-def get_method_start_end(method_node, tree):
+def find_member_end(tokens, index) -> int:
     """
-    Obtém a posição de início e fim de um método na árvore de análise.
+    Avança do token informado até o '}' que fecha o corpo do método ou até o ';' de um método sem corpo.
+    Chaves em strings e comentários não são tokens e, portanto, não interferem.
     """
-    startpos = None
-    endpos = None
-    startline = None
-    endline = None
-
-    # Itera sobre a árvore de análise para encontrar o início e o fim do método
-    for path, node in tree:
-        # Se o início foi encontrado e o método atual não está no caminho
-        if startpos is not None and method_node not in path:
-            # Atribui a posição de término e a linha de término
-            endpos = node.position
-            endline = node.position.line if node.position is not None else None
-            break
-
-        # Se o início ainda não foi encontrado e o nó atual é o método em questão
-        if startpos is None and node == method_node:
-            # Atribui a posição de início e a linha de início
-            startpos = node.position
-            startline = node.position.line if node.position is not None else None
+    depth = 0
+    while index < len(tokens):
+        value = tokens[index].value
+        if value == '(':
+            depth += 1
+        elif value == ')':
+            depth -= 1
+        elif depth == 0 and value == ';':
+            return index
+        elif depth == 0 and value == '{':
+            braces = 0
+            for index in range(index, len(tokens)):
+                value = tokens[index].value
+                if value == '{':
+                    braces += 1
+                elif value == '}':
+                    braces -= 1
+                    if braces == 0:
+                        return index
+            return index
+        index += 1
+    return len(tokens) - 1
+
+
+def get_method_spans(tree, tokens, code):
+    """
+    Obtém, pelos tokens, a posição exata do texto de cada método no código, incluindo o Javadoc
+    e as anotações. Cada token é visitado um número constante de vezes: a extração é linear.
+    Retorna uma lista, na ordem de declaração, de (method_node, start, end, startline, endline).
+    """
+    line_offsets = get_line_offsets(code)
+    token_indexes = {(token.position.line, token.position.column): index for index, token in enumerate(tokens)}
 
-    return startpos, endpos, startline, endline
+    def get_offset(token):
+        return line_offsets[token.position.line - 1] + token.position.column - 1
 
+    spans = []
+    nodes = 0
+    for _, node in tree:
+        nodes += 1
+        if not isinstance(node, javalang.tree.MethodDeclaration):
+            continue
 
-def get_method_text(startpos, endpos, startline, endline, last_endline_index, codelines):
-    """
-    Obtém o texto do método Java.
-    """
-    if startpos is None:
-        return "", None, None, None
-    else:
-        startline_index = startline - 1
-        endline_index = endline - 1 if endpos is not None else None
+        index = token_indexes.get((node.position.line, node.position.column)) if node.position else None
+        if index is None:
+            spans.append((node, None, None, None, None))
+            continue
 
-        # Verifica e recupera anotações, ajustando o início da linha se necessário
-        if last_endline_index is not None:
-            for line in codelines[(last_endline_index + 1):(startline_index)]:
-                if "@" in line:
-                    startline_index = startline_index - 1
+        first = find_member_start(tokens, index)
+        last = find_member_end(tokens, index)
+        start = get_offset(tokens[first])
+        end = get_offset(tokens[last]) + len(tokens[last].value)
 
-        # Obtém o texto do método e mantém as chaves {}
-        meth_text = "<ST>".join(codelines[startline_index:endline_index])
-        meth_text = meth_text[:meth_text.rfind("}") + 1]
+        if tokens[first].javadoc:
+            javadoc_start = code.rfind(tokens[first].javadoc, 0, start)
+            if javadoc_start != -1:
+                start = javadoc_start
 
-        # Remove chaves e conteúdo externo/comentários indesejados
-        if not abs(meth_text.count("}") - meth_text.count("{")) == 0:
-            brace_diff = abs(meth_text.count("}") - meth_text.count("{"))
-            for _ in range(brace_diff):
-                meth_text = meth_text[:meth_text.rfind("}")]
-                meth_text = meth_text[:meth_text.rfind("}") + 1]
+        # Mantém a indentação da primeira linha
+        line_start = code.rfind('\n', 0, start) + 1
+        if not code[line_start:start].strip():
+            start = line_start
 
-        # Formata o texto do método e as linhas
-        meth_lines = meth_text.split("<ST>")
-        meth_text = "".join(meth_lines)
-        last_endline_index = startline_index + (len(meth_lines) - 1)
+        startline = bisect.bisect_right(line_offsets, start)
+        endline = bisect.bisect_right(line_offsets, end - 1)
+        spans.append((node, start, end, startline, endline))
 
-        return meth_text, (startline_index + 1), (last_endline_index + 1), last_endline_index
+    profiler.count('nodes_visited', nodes)
+    return spans
 
 
-def get_method(name, tree, codelines):
+def get_method_key(method_node) -> str:
     """
-    Obtém o texto do método Java pelo nome.
+    Obtém a chave da sobrecarga do método, ex.: findById(Long).
     """
-    lex = None
-    # Filtra e processa os métodos encontrados na árvore de análise
-    for _, method_node in tree.filter(javalang.tree.MethodDeclaration):
-        startpos, endpos, startline, endline = get_method_start_end(method_node, tree)
-        method_text, startline, endline, lex = get_method_text(startpos, endpos, startline, endline, lex, codelines)
-        if method_node.name == name:
-            return method_text
+    parameters = []
+    for parameter in method_node.parameters:
+        dimensions = len(parameter.type.dimensions or [])
+        varargs = '...' if parameter.varargs else ''
+        parameters.append(f"{parameter.type.name}{'[]' * dimensions}{varargs}")
+    return f"{method_node.name}({', '.join(parameters)})"
 
 
-def get_method_signature(name, tree, codelines):
+def build_method_records(tree, code, tokens=None) -> Tuple[List[java_model.MethodRecord], Dict[int, int]]:
     """
-    Obtém a assinatura do método Java pelo nome.
+    Extrai os métodos do arquivo, na ordem de declaração, guardando apenas a posição do texto no código.
+    Retorna também a posição na lista de cada nó de método (pelo id do nó).
     """
-    lex = None
-    # Filtra e processa os métodos encontrados na árvore de análise
-    for _, method_node in tree.filter(javalang.tree.MethodDeclaration):
-        startpos, endpos, startline, endline = get_method_start_end(method_node, tree)
-        method_text, startline, endline, lex = get_method_text(startpos, endpos, startline, endline, lex, codelines)
-        if method_node.name == name:
-            return format_method_signature(method_text)
+    if tokens is None:
+        tokens = list(javalang.tokenizer.tokenize(code))
+
+    records = []
+    positions = {}
+    with profiler.span('util.get_method_spans'):
+        spans = get_method_spans(tree, tokens, code)
+
+    for method_node, start, end, startline, endline in spans:
+        method_text = code[start:end] if start is not None else ""
+        positions[id(method_node)] = len(records)
+        records.append(java_model.MethodRecord(
+            name=method_node.name,
+            key=get_method_key(method_node),
+            modifiers=tuple(sorted(java_model.intern(modifier) for modifier in method_node.modifiers)),
+            start=start,
+            end=end,
+            signature=format_method_signature(method_text),
+            startline=startline,
+            endline=endline,
+        ))
+        profiler.count('methods_extracted')
+
+    return records, positions
 
 
 def format_method_signature(method_text):
@@ -152,26 +199,101 @@ def get_java_files(source_path):
     """
     Retorna uma lista dos arquivos .java no diretório de origem.
     """
-    java_files = []
-    for root, _, files in os.walk(source_path):
-        for file in files:
-            if file.endswith(".java"):
-                java_files.append(os.path.join(root, file))
-    return java_files
+    return list(file_discovery.iter_files(source_path))
+
+
+def get_package_name(tree):
+    """
+    Obtém o nome do pacote Java da árvore de análise.
+    """
+    return tree.package.name if tree.package is not None else None
+
+
+def read_qualified_name(tokens) -> str:
+    """
+    Lê os tokens até o ';' e retorna o nome qualificado, ex.: io.demo.shop.services.
+    Modificadores (o static de um import estático) são ignorados.
+    """
+    parts = []
+    for token in tokens:
+        if token.value == ';':
+            break
+        if not isinstance(token, javalang.tokenizer.Modifier):
+            parts.append(token.value)
+    return ''.join(parts)
+
+
+def scan_java_header(code) -> JavaHeader:
+    """
+    Extrai o pacote, os imports e o nome e tipo (class, interface, enum ou annotation)
+    da primeira declaração de tipo, usando apenas o tokenizador.
+    A leitura para na declaração do tipo, sem analisar o corpo do arquivo.
+    """
+    header = {'package_name': None, 'type_name': None, 'type_kind': None, 'imports': []}
+    tokens = javalang.tokenizer.tokenize(code)
+    previous = None
+
+    for token in tokens:
+        value = token.value
+        if value == 'package':
+            header['package_name'] = read_qualified_name(tokens)
+        elif value == 'import':
+            path = read_qualified_name(tokens)
+            if path.endswith('.*'):
+                path = path[:-2]
+            header['imports'].append(path)
+        elif value == '(':
+            # Ignora os argumentos das anotações, que podem conter, por exemplo, String.class
+            depth = 1
+            for argument_token in tokens:
+                if argument_token.value == '(':
+                    depth += 1
+                elif argument_token.value == ')':
+                    depth -= 1
+                    if depth == 0:
+                        break
+        elif value in ('class', 'interface', 'enum') and isinstance(token, javalang.tokenizer.Keyword):
+            header['type_kind'] = 'annotation' if previous == '@' else value
+            header['type_name'] = next(tokens).value
+            break
+        previous = value
+
+    return header
 
 
-def get_package_name_and_class_name(code):
+def read_java_header(source_file) -> JavaHeader:
     """
-    Extrai o nome do pacote e o nome da classe Java a partir do código fonte.
+    Lê o cabeçalho de um arquivo .java. Pode ser executada em um processo filho.
     """
-    tree = javalang.parse.parse(code)
-    package_name = None
-    class_name = get_class_name(tree)
+    stat = os.stat(source_file)
+    with open(source_file, 'r') as f, profiler.span('util.scan_java_header'):
+        header = scan_java_header(f.read())
+    profiler.count('headers_scanned')
 
-    for path, node in tree.filter(javalang.tree.PackageDeclaration):
-        package_name = node.name
+    header.update({'path': source_file, 'mtime': stat.st_mtime_ns, 'size': stat.st_size})
+    return header
 
-    return package_name, class_name
+
+def get_cached_java_header(source_file) -> JavaHeader:
+    header = _java_headers.get(source_file)
+    if header is None:
+        return None
+
+    stat = os.stat(source_file)
+    if header['mtime'] == stat.st_mtime_ns and header['size'] == stat.st_size:
+        return header
+    return None
+
+
+def load_java_headers(java_files) -> List[JavaHeader]:
+    """
+    Obtém os cabeçalhos dos arquivos .java, sem a análise completa com o javalang.
+    """
+    java_files = [os.path.abspath(source_file) for source_file in java_files]
+    pending = [source_file for source_file in java_files if get_cached_java_header(source_file) is None]
+    for header in parallel.map_files(read_java_header, pending):
+        _java_headers[header['path']] = header
+    return [_java_headers[source_file] for source_file in java_files]
 
 
 def extract_dependencies(node):
@@ -186,26 +308,138 @@ def extract_dependencies(node):
     return dependencies
 
 
-def process_java_file(source_file):
+def extract_java_model(tree, code, tokens=None) -> java_model.FileRecord:
+    """
+    Extrai da árvore as informações usadas pelas etapas, em um modelo compacto.
+    A árvore pode ser descartada em seguida: o texto dos métodos é obtido do código pela posição.
+    """
+    methods, positions = build_method_records(tree, code, tokens)
+    classes = []
+    for _, node in tree.filter(javalang.tree.ClassDeclaration):
+        classes.append(java_model.ClassRecord(
+            name=node.name,
+            fields=tuple(
+                java_model.FieldRecord(java_model.intern(dependency['type']), dependency['name'])
+                for dependency in extract_dependencies(node)
+            ),
+            methods=tuple(positions[id(method)] for method in node.methods),
+        ))
+
+    return java_model.FileRecord(
+        package_name=java_model.intern(get_package_name(tree)),
+        class_name=get_class_name(tree),
+        interfaces=tuple(node.name for _, node in tree.filter(javalang.tree.InterfaceDeclaration)),
+        imports=tuple(extract_imports(tree)),
+        classes=tuple(classes),
+        methods=tuple(methods),
+        code=code,
+    )
+
+
+def load_java_unit(source_file) -> JavaUnit:
+    """
+    Lê e analisa um arquivo .java, consultando o cache em disco.
+    Pode ser executada em um processo filho: não grava nada e retorna apenas o modelo extraído.
+    """
+    stat = os.stat(source_file)
+    with open(source_file, 'r') as f:
+        code = f.read()
+    content_hash = hashlib.sha1(code.encode('utf-8')).hexdigest()
+
+    data = disk_cache.load_model(content_hash)
+    from_cache = data is not None
+    if from_cache:
+        model = java_model.from_json(data, code)
+    else:
+        # Os mesmos tokens servem para a análise e para a posição dos métodos
+        with profiler.span('javalang.parse'):
+            tokens = list(javalang.tokenizer.tokenize(code))
+            tree = javalang.parser.Parser(tokens).parse()
+        with profiler.span('util.extract_java_model'):
+            model = extract_java_model(tree, code, tokens)
+        profiler.count('files_parsed')
+
+    return {
+        'path': source_file,
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'hash': content_hash,
+        'model': model,
+        'from_cache': from_cache,
+    }
+
+
+def register_java_unit(unit: JavaUnit) -> JavaUnit:
+    """
+    Guarda no processo principal o arquivo analisado e atualiza o cache em disco.
+    """
+    disk_cache.record_lookup(unit['from_cache'])
+    if not unit['from_cache']:
+        disk_cache.store_model(unit['hash'], java_model.to_json(unit['model']))
+        unit['from_cache'] = True
+
+    _java_units[unit['path']] = unit
+    return unit
+
+
+def get_java_model(unit: JavaUnit) -> java_model.FileRecord:
     """
-    Processa um arquivo .java.
+    Obtém apenas o modelo extraído do arquivo, compacto para ser enviado a um processo filho.
     """
+    return unit['model']
+
+
+def get_cached_java_unit(source_file, stat=None) -> JavaUnit:
+    """
+    Obtém o arquivo do cache em memória, se ele não mudou desde a análise.
+    """
+    unit = _java_units.get(source_file)
+    if unit is None:
+        return None
+
+    stat = stat or os.stat(source_file)
+    if unit['mtime'] == stat.st_mtime_ns and unit['size'] == stat.st_size:
+        return unit
+
+    # mtime ou tamanho mudaram: confirma pelo hash do conteúdo
     with open(source_file, 'r') as f:
-        codelines = f.readlines()
-        code = ''.join(codelines)
+        content_hash = hashlib.sha1(f.read().encode('utf-8')).hexdigest()
+    if unit['hash'] == content_hash:
+        unit['mtime'] = stat.st_mtime_ns
+        unit['size'] = stat.st_size
+        return unit
+    return None
+
 
-    package_name, class_name = get_package_name_and_class_name(code)
-    tree = javalang.parse.parse(code)
-    return package_name, class_name, tree, codelines
+def load_java_units(java_files) -> List[JavaUnit]:
+    """
+    Obtém os arquivos .java analisados, analisando em paralelo os que não estão no cache.
+    """
+    java_files = [os.path.abspath(source_file) for source_file in java_files]
+    pending = [
+        source_file for source_file in java_files
+        if get_cached_java_unit(source_file, file_discovery.get_stat(source_file)) is None
+    ]
+    for unit in parallel.map_files(load_java_unit, pending):
+        register_java_unit(unit)
+    return [_java_units[source_file] for source_file in java_files]
 
 
-def extract_imports(tree):
+def clear_java_units():
     """
-    Extrai os imports de uma classe Java.
+    Limpa o cache de arquivos analisados.
+    """
+    _java_units.clear()
+    _java_headers.clear()
+
+
+def extract_imports(tree) -> List[java_model.ImportRecord]:
+    """
+    Extrai os imports de uma classe Java, mantendo os imports estáticos e com *.
     """
     imports = []
     for _, node in tree.filter(javalang.tree.Import):
-        imports.append(node.path)
+        imports.append(java_model.ImportRecord(java_model.intern(node.path), node.static, node.wildcard))
 
     return imports
 
@@ -218,64 +452,3 @@ def get_templates_dir():
         raise FileNotFoundError(f"O diretório de templates '{templates_dir}' não foi encontrado.")
 
     return templates_dir
-
-
-def copy_file(source_path, destiny_path, file_name):
-    if not os.path.exists(destiny_path):
-        os.makedirs(destiny_path)
-    source_path = f'{os.path.join(source_path, file_name)}.java'
-    destiny_path = f'{os.path.join(destiny_path, file_name)}.java'
-    if os.path.exists(source_path) and not os.path.exists(destiny_path):
-        shutil.copyfile(source_path, destiny_path)
-
-
-def copy_dirs(source_directory: str, dir_name: str, files: List[str]):
-    source_path = os.path.join(source_directory, dir_name)
-    for file in files:
-        config_source_path = os.path.join(source_directory, file)
-        config_destiny_path = os.path.join(source_path, file)
-        if os.path.exists(config_source_path) and not os.path.exists(config_destiny_path):
-            shutil.copytree(config_source_path, config_destiny_path)
-
-
-def remane_dirs(source_directory: str, new_name: str, dirs_names: List[str]):
-    for dir_name in dirs_names:
-        print(f'Diretório: {dir_name} caminho: {os.path.join(source_directory, dir_name)}')
-        source_path = os.path.join(source_directory, dir_name)
-        destiny_path = os.path.join(source_directory, new_name)
-        if os.path.exists(source_path) and not os.path.exists(destiny_path):
-            os.rename(source_path, destiny_path)
-            print(f'Diretório renomeado: {dir_name} para {new_name}')
-            break
-
-
-def remove_suffix_in_java_files(source_directory: str, suffix: str):
-    # Verifica se o diretório de origem existe
-    if not os.path.exists(source_directory):
-        print(f'O diretório "{source_directory}" não existe.')
-        return
-
-    # Lista todos os arquivos no diretório de origem
-    for root, dirs, files in os.walk(source_directory):
-        for file in files:
-            if file.endswith('.java') and suffix in file and not file.startswith(suffix):
-                old_file_path = os.path.join(root, file)
-                new_file_path = os.path.join(root, file.replace(suffix, ''))
-                os.rename(old_file_path, new_file_path)
-                print(f'Arquivo renomeado: {old_file_path} para {new_file_path}')
-
-
-def add_suffix_in_java_files(source_directory: str, suffix: str):
-    # Verifica se o diretório de origem existe
-    if not os.path.exists(source_directory):
-        print(f'O diretório "{source_directory}" não existe.')
-        return
-
-    # Lista todos os arquivos no diretório de origem
-    for root, dirs, files in os.walk(source_directory):
-        for file in files:
-            if file.endswith('.java') and not file.endswith(f"{suffix}.java"):
-                old_file_path = os.path.join(root, file)
-                new_file_path = os.path.join(root, f"{os.path.splitext(file)[0]}{suffix}.java")
-                os.rename(old_file_path, new_file_path)
-                print(f'Arquivo renomeado: {old_file_path} para {new_file_path}')
@@ -0,0 +1,286 @@
+import os
+import shutil
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from src.utils import lazy
+
+# Usado apenas para gerar o diff do --plan
+difflib = lazy.lazy_import('difflib')
+
+# Em modo de planejamento (--plan) nenhuma alteração vai para o disco: os arquivos criados,
+# copiados, renomeados e removidos ficam em uma camada em memória sobre o sistema de arquivos real.
+_plan_mode = False
+
+# Arquivos alterados: ('content', texto), ('copy', caminho real de origem) ou None (removido)
+FileEntry = Optional[Tuple[str, str]]
+_files: Dict[str, FileEntry] = {}
+
+# Diretórios criados e número de arquivos virtuais dentro de cada um (em qualquer nível)
+_dirs: Set[str] = set()
+_dir_refs: Dict[str, int] = {}
+
+# Diretórios reais que foram renomeados
+_removed_dirs: Set[str] = set()
+
+
+def enable_plan_mode():
+    global _plan_mode
+    _plan_mode = True
+    reset()
+
+
+def is_plan_mode() -> bool:
+    return _plan_mode
+
+
+def reset():
+    _files.clear()
+    _dirs.clear()
+    _dir_refs.clear()
+    _removed_dirs.clear()
+
+
+def get_parent_dirs(path: str) -> Iterator[str]:
+    parent = os.path.dirname(path)
+    while parent and parent != os.path.dirname(parent):
+        yield parent
+        parent = os.path.dirname(parent)
+
+
+def is_removed(path: str) -> bool:
+    if path in _removed_dirs:
+        return True
+    return any(parent in _removed_dirs for parent in get_parent_dirs(path))
+
+
+def set_entry(path: str, entry: FileEntry):
+    """
+    Registra o novo estado de um arquivo, mantendo a contagem de arquivos por diretório.
+    """
+    path = os.path.abspath(path)
+    was_virtual = _files.get(path) is not None
+    _files[path] = entry
+    if entry is not None and not was_virtual:
+        for parent in get_parent_dirs(path):
+            _dir_refs[parent] = _dir_refs.get(parent, 0) + 1
+    elif entry is None and was_virtual:
+        for parent in get_parent_dirs(path):
+            _dir_refs[parent] -= 1
+
+
+def get_entry(path: str) -> FileEntry:
+    """
+    Obtém o estado atual do arquivo, real ou virtual.
+    """
+    path = os.path.abspath(path)
+    if path in _files:
+        return _files[path]
+    if not is_removed(path) and os.path.isfile(path):
+        return 'copy', path
+    return None
+
+
+def isfile(path: str) -> bool:
+    if not _plan_mode:
+        return os.path.isfile(path)
+    return get_entry(path) is not None
+
+
+def isdir(path: str) -> bool:
+    if not _plan_mode:
+        return os.path.isdir(path)
+
+    path = os.path.abspath(path)
+    if path in _dirs or _dir_refs.get(path, 0) > 0:
+        return True
+    return not is_removed(path) and os.path.isdir(path)
+
+
+def exists(path: str) -> bool:
+    if not _plan_mode:
+        return os.path.exists(path)
+    return isfile(path) or isdir(path)
+
+
+def makedirs(path: str):
+    if not _plan_mode:
+        os.makedirs(path, exist_ok=True)
+        return
+
+    path = os.path.abspath(path)
+    _dirs.add(path)
+    _removed_dirs.difference_update([path, *get_parent_dirs(path)])
+
+
+def read_text(path: str) -> str:
+    if not _plan_mode:
+        with open(path, 'r') as f:
+            return f.read()
+
+    entry = get_entry(path)
+    if entry is None:
+        raise FileNotFoundError(path)
+    kind, value = entry
+    if kind == 'content':
+        return value
+    with open(value, 'r') as f:
+        return f.read()
+
+
+def write_text(path: str, content: str):
+    """
+    Em modo de planejamento, registra o conteúdo do arquivo em memória.
+    """
+    makedirs(os.path.dirname(path))
+    set_entry(path, ('content', content))
+
+
+def copy_file(source_path: str, destiny_path: str):
+    if not _plan_mode:
+        shutil.copyfile(source_path, destiny_path)
+        return
+    set_entry(destiny_path, get_entry(source_path))
+
+
+def walk(top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """
+    Percorre o diretório como os.walk, considerando as alterações em memória.
+    """
+    if not _plan_mode:
+        yield from os.walk(top)
+        return
+
+    top = os.path.abspath(top)
+    tree: Dict[str, Tuple[Set[str], Set[str]]] = {}
+
+    def add_dir(directory):
+        if directory in tree:
+            return
+        tree[directory] = (set(), set())
+        if directory != top:
+            parent = os.path.dirname(directory)
+            add_dir(parent)
+            tree[parent][0].add(os.path.basename(directory))
+
+    if isdir(top):
+        add_dir(top)
+        if not is_removed(top):
+            for root, dirs, files in os.walk(top):
+                if is_removed(root):
+                    dirs[:] = []
+                    continue
+                add_dir(root)
+                for file in files:
+                    if get_entry(os.path.join(root, file)) is not None:
+                        tree[root][1].add(file)
+
+        prefix = os.path.join(top, '')
+        for directory in _dirs:
+            if directory.startswith(prefix):
+                add_dir(directory)
+        for path, entry in _files.items():
+            if entry is not None and path.startswith(prefix):
+                add_dir(os.path.dirname(path))
+                tree[os.path.dirname(path)][1].add(os.path.basename(path))
+
+    def walk_dir(directory):
+        dirs, files = tree[directory]
+        dirs = sorted(dirs)
+        yield directory, dirs, sorted(files)
+        for dir_name in dirs:
+            yield from walk_dir(os.path.join(directory, dir_name))
+
+    if top in tree:
+        yield from walk_dir(top)
+
+
+def remove(path: str):
+    if not _plan_mode:
+        os.remove(path)
+        return
+    set_entry(path, None)
+
+
+def rename(source_path: str, destiny_path: str):
+    if not _plan_mode:
+        os.rename(source_path, destiny_path)
+        return
+
+    source_path = os.path.abspath(source_path)
+    destiny_path = os.path.abspath(destiny_path)
+    if isfile(source_path):
+        entry = get_entry(source_path)
+        set_entry(source_path, None)
+        set_entry(destiny_path, entry)
+        return
+
+    for root, dirs, files in list(walk(source_path)):
+        relative_root = os.path.relpath(root, source_path)
+        makedirs(os.path.normpath(os.path.join(destiny_path, relative_root)))
+        for file in files:
+            path = os.path.join(root, file)
+            entry = get_entry(path)
+            set_entry(path, None)
+            set_entry(os.path.normpath(os.path.join(destiny_path, relative_root, file)), entry)
+
+    _dirs.difference_update([directory for directory in _dirs
+                             if directory == source_path or directory.startswith(os.path.join(source_path, ''))])
+    if os.path.isdir(source_path):
+        _removed_dirs.add(source_path)
+
+
+def read_real_text(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def get_changes() -> List[Dict[str, Optional[str]]]:
+    """
+    Obtém as alterações planejadas: created, modified ou deleted, com o conteúdo antigo e o novo.
+    """
+    changes = []
+    for path in sorted(_files):
+        entry = _files[path]
+        old_content = read_real_text(path) if os.path.isfile(path) else None
+        if entry is None:
+            if old_content is None and not os.path.isfile(path):
+                continue
+            changes.append({'action': 'deleted', 'path': path, 'old': old_content, 'new': None})
+            continue
+
+        kind, value = entry
+        new_content = value if kind == 'content' else read_real_text(value)
+        if not os.path.isfile(path):
+            changes.append({'action': 'created', 'path': path, 'old': None, 'new': new_content})
+        elif old_content != new_content:
+            changes.append({'action': 'modified', 'path': path, 'old': old_content, 'new': new_content})
+    return changes
+
+
+def get_unified_diff(base_path: str) -> str:
+    """
+    Obtém as alterações planejadas no formato unified diff, com caminhos relativos a base_path.
+    """
+    diff = []
+    for change in get_changes():
+        relative_path = os.path.relpath(change['path'], base_path)
+        old_lines = (change['old'] or '').splitlines(keepends=True)
+        new_lines = (change['new'] or '').splitlines(keepends=True)
+        from_file = '/dev/null' if change['action'] == 'created' else f'a/{relative_path}'
+        to_file = '/dev/null' if change['action'] == 'deleted' else f'b/{relative_path}'
+        for line in difflib.unified_diff(old_lines, new_lines, from_file, to_file):
+            diff.append(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n')
+    return ''.join(diff)
+
+
+def get_change_plan(base_path: str) -> List[Dict[str, str]]:
+    """
+    Obtém as alterações planejadas em formato serializável (JSON), sem o conteúdo dos arquivos.
+    """
+    return [
+        {'action': change['action'], 'path': os.path.relpath(change['path'], base_path)}
+        for change in get_changes()
+    ]
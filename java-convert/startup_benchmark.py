@@ -0,0 +1,26 @@
+from src.benchmark import startup
+import argparse
+import json
+import sys
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da inicialização da ferramenta (python -X importtime)")
+    parser.add_argument('--runs', type=int, default=5, help='Número de execuções medidas (é usada a mediana)')
+    parser.add_argument('--budget-ms', type=float, default=startup.DEFAULT_BUDGET_MS,
+                        help=f'Tempo máximo de importação do main.py em ms (padrão: {startup.DEFAULT_BUDGET_MS})')
+    parser.add_argument('--top', type=int, default=10, help='Número de módulos mais lentos listados')
+    parser.add_argument('--output', type=str, default=None, help='Arquivo JSON de saída (padrão: stdout)')
+
+    args = parser.parse_args()
+
+    report = startup.run_startup_benchmark(args.runs, args.budget_ms, args.top)
+    result = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(result + '\n')
+    else:
+        print(result)
+
+    for violation in report['violations']:
+        print(violation, file=sys.stderr)
+    sys.exit(1 if report['violations'] else 0)